@@ -5,17 +5,71 @@ Agents for handling different types of queries.
 """
 
 import json
-from typing import Dict, Any
+import re
+from typing import Dict, Any, Optional
 from datetime import datetime
 from backend.db.database import (
-    get_customer_profile,
-    get_customer_support_tickets,
+    get_customer_bundle,
     search_customers
 )
 from backend.rag.rag_pipeline import (
     query_policy_documents,
     get_policy_summary
 )
+from backend.keywords import compile_keywords
+
+
+# Keyword -> policy document used for direct policy summaries
+_POLICY_SUMMARIES = {
+    "refund": "refund_policy",
+    "warranty": "warranty_policy",
+    "shipping": "shipping_policy",
+    "privacy": "privacy_policy",
+    "terms": "terms_of_service"
+}
+_POLICY_SUMMARY_RE = compile_keywords(_POLICY_SUMMARIES)
+
+
+def _summary_keyword(found) -> str:
+    """Highest-priority policy-summary keyword among those found (dict order: refund first), or ""."""
+    return next((keyword for keyword in _POLICY_SUMMARIES if keyword in found), "")
+
+
+# Keywords used by CustomerAgent to decide which data to fetch
+_PROFILE_KEYWORDS = frozenset({"profile", "customer info", "account", "details"})
+_TICKET_KEYWORDS = frozenset({"ticket", "support", "issue", "complaint", "history"})
+_PROFILE_RE = compile_keywords(_PROFILE_KEYWORDS)
+_TICKET_RE = compile_keywords(_TICKET_KEYWORDS)
+
+# Keywords used by the orchestrator to route queries
+_POLICY_KEYWORDS = frozenset({
+    "policy", "refund", "warranty", "shipping", "privacy", "terms", "guarantee", "coverage"
+})
+_CUSTOMER_KEYWORDS = frozenset({
+    "customer", "profile", "support ticket", "issue", "complaint", "order", "account"
+})
+_POLICY_RE = compile_keywords(_POLICY_KEYWORDS)
+_CUSTOMER_RE = compile_keywords(_CUSTOMER_KEYWORDS)
+
+# Customer name extraction, tried in priority order from the start of the question:
+# a name after "customer/for/about/profile" (any case, optionally followed by a
+# capitalized surname), a quoted name, two capitalized words, a possessive
+# capitalized word ("Lisa's"), then a single capitalized word that does not
+# start the question
+_NAME_WORD = r"[A-Z][\w-]*"
+# Words after a keyword that are never the name ("profile details for ...")
+_NAME_SKIP = r"customer|for|profile|tickets|about|the|a|an|and|of|with|details|info|history|me|my|please"
+_NAME_RE = re.compile(
+    rf"""^(?:
+        (?=.*?\b(?i:customer|for|about|profile)\s+(?!(?i:{_NAME_SKIP})\b)
+            (?P<keyword>(?i:[a-z][\w-]*)(?:\s+{_NAME_WORD})?))
+      | (?=.*?(?<!\w)['"](?P<quoted>[^'"]+)['"](?!\w))
+      | (?=.*?\b(?P<full_name>{_NAME_WORD}\s+{_NAME_WORD}))
+      | (?=.*?\b(?P<possessive>{_NAME_WORD})'s\b)
+      | (?=.*?(?<=\s)(?P<single>{_NAME_WORD}))
+    )""",
+    re.VERBOSE | re.DOTALL
+)
 
 
 class PolicyAgent:
@@ -25,35 +79,34 @@ class PolicyAgent:
         self.name = "PolicyAgent"
         self.description = "Answers questions about company policies"
 
-    def process_query(self, question: str) -> Dict[str, Any]:
+    def process_query(self, question: str, policy_hint: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a policy question.
         
         Args:
             question: The user's question about policies
+            policy_hint: Policy-summary keyword already found by the router
+                ("" if there is none); None to scan the question here
             
         Returns:
             Dictionary with answer, sources, and metadata
         """
-        # Check if it's asking for a specific policy summary
-        policy_keywords = {
-            "refund": "refund_policy",
-            "warranty": "warranty_policy",
-            "shipping": "shipping_policy",
-            "privacy": "privacy_policy",
-            "terms": "terms_of_service"
-        }
+        if policy_hint is None:
+            policy_hint = _summary_keyword(
+                {match.group(0).lower() for match in _POLICY_SUMMARY_RE.finditer(question)}
+            )
 
-        for keyword, policy_name in policy_keywords.items():
-            if keyword.lower() in question.lower():
-                summary = get_policy_summary(policy_name)
-                return {
-                    "agent": self.name,
-                    "type": "policy_summary",
-                    "policy": policy_name.replace("_", " ").title(),
-                    "content": summary,
-                    "timestamp": datetime.now().isoformat()
-                }
+        # Check if it's asking for a specific policy summary
+        if policy_hint:
+            policy_name = _POLICY_SUMMARIES[policy_hint.lower()]
+            summary = get_policy_summary(policy_name)
+            return {
+                "agent": self.name,
+                "type": "policy_summary",
+                "policy": policy_name.replace("_", " ").title(),
+                "content": summary,
+                "timestamp": datetime.now().isoformat()
+            }
 
         # Otherwise, use RAG to answer the question
         result = query_policy_documents(question, top_k=3)
@@ -96,23 +149,19 @@ class CustomerAgent:
                 "timestamp": datetime.now().isoformat()
             }
 
-        # Determine what information is requested
+        # Fetch profile and tickets in one query, then keep what was requested
+        bundle = self._get_bundle(customer_name)
         result = {}
 
-        if any(word in question.lower() for word in ["profile", "customer info", "account", "details"]):
-            profile = get_customer_profile(customer_name)
-            result["profile"] = profile
+        if _PROFILE_RE.search(question):
+            result["profile"] = bundle["profile"]
 
-        if any(word in question.lower() for word in ["ticket", "support", "issue", "complaint", "history"]):
-            tickets = get_customer_support_tickets(customer_name)
-            result["tickets"] = tickets
+        if _TICKET_RE.search(question):
+            result["tickets"] = bundle["tickets"]
 
         # If no specific request, return both
         if not result:
-            profile = get_customer_profile(customer_name)
-            tickets = get_customer_support_tickets(customer_name)
-            result["profile"] = profile
-            result["tickets"] = tickets
+            result = bundle
 
         return {
             "agent": self.name,
@@ -123,32 +172,18 @@ class CustomerAgent:
             "timestamp": datetime.now().isoformat()
         }
 
+    def _get_bundle(self, customer_name: str) -> Dict[str, Any]:
+        """Get {"profile": ..., "tickets": ...} for a customer with a single SQL round trip."""
+        return get_customer_bundle(customer_name)
+
     def _extract_customer_name(self, question: str) -> str:
         """
         Extract customer name from question.
         Looks for patterns like "customer X's profile" or "X's support tickets"
         """
-        # Simple extraction - split by common keywords
-        keywords = ["customer", "for", "profile", "tickets", "about"]
-
-        words = question.split()
-        for i, word in enumerate(words):
-            if word.lower() in keywords and i + 1 < len(words):
-                # Get next word as potential customer name
-                potential_name = words[i + 1].strip("'s,.")
-                if potential_name and not potential_name.lower() in keywords:
-                    return potential_name
-
-        # Try to extract quoted name
-        import re
-        match = re.search(r"['\"]([^'\"]+)['\"]", question)
+        match = _NAME_RE.match(question)
         if match:
-            return match.group(1)
-
-        # Try to extract capitalized words (likely names)
-        names = [word.strip("'s,.") for word in words if word[0].isupper() and word.lower() not in keywords]
-        if names:
-            return " ".join(names[:2])  # Take first two capitalized words
+            return next(group for group in match.groups() if group)
 
         return None
 
@@ -170,22 +205,20 @@ class MultiAgentOrchestrator:
         Returns:
             Response from the appropriate agent
         """
-        # Determine query type
-        policy_keywords = ["policy", "refund", "warranty", "shipping", "privacy", "terms", "guarantee", "coverage"]
-        customer_keywords = ["customer", "profile", "support ticket", "issue", "complaint", "order", "account"]
-
-        question_lower = question.lower()
-        is_policy_query = any(keyword in question_lower for keyword in policy_keywords)
-        is_customer_query = any(keyword in question_lower for keyword in customer_keywords)
+        # Determine query type; the same scan finds the policy-summary keyword
+        policy_found = {match.group(0).lower() for match in _POLICY_RE.finditer(question)}
+        is_policy_query = bool(policy_found)
+        policy_hint = _summary_keyword(policy_found)
+        is_customer_query = bool(_CUSTOMER_RE.search(question))
 
         # Route to appropriate agent
         if is_policy_query and not is_customer_query:
-            return self.policy_agent.process_query(question)
+            return self.policy_agent.process_query(question, policy_hint)
         elif is_customer_query:
             return self.customer_agent.process_query(question)
         else:
             # Default: try policy agent first
-            return self.policy_agent.process_query(question)
+            return self.policy_agent.process_query(question, policy_hint)
 
     def process(self, question: str) -> str:
         """
@@ -197,8 +230,23 @@ class MultiAgentOrchestrator:
         Returns:
             Formatted response string
         """
+        return self.process_with_route(question)["response"]
+
+    def process_with_route(self, question: str) -> Dict[str, Any]:
+        """
+        Route a question once and return both the agent result and its formatted response.
+        
+        Args:
+            question: The user's question
+            
+        Returns:
+            Dict with the raw agent "result" and the formatted "response" string
+        """
         result = self.route_query(question)
+        return {"result": result, "response": self._format_response(result)}
 
+    def _format_response(self, result: Dict[str, Any]) -> str:
+        """Format an agent result as a response string."""
         if result.get("agent") == "PolicyAgent":
             if result.get("type") == "policy_summary":
                 return f"**{result['policy']}**\n\n{result['content']}"
@@ -209,28 +257,32 @@ class MultiAgentOrchestrator:
             if result.get("type") == "error":
                 return result.get("message", "Error processing query")
             else:
-                # Format customer data response
-                response = f"**Customer: {result.get('customer_name')}**\n\n"
+                # Format customer data response (joined once at the end)
+                parts = [f"**Customer: {result.get('customer_name')}**\n\n"]
 
                 if "profile" in result.get("data", {}):
                     profile = result["data"]["profile"]
                     if "error" not in profile:
-                        response += f"**Profile:**\n"
-                        response += f"- Email: {profile.get('email')}\n"
-                        response += f"- Phone: {profile.get('phone')}\n"
-                        response += f"- Account Status: {profile.get('account_status')}\n"
-                        response += f"- Account Type: {profile.get('account_type')}\n"
-                        response += f"- Total Orders: {profile.get('total_orders')}\n"
-                        response += f"- Lifetime Value: ${profile.get('lifetime_value')}\n\n"
+                        parts.append(
+                            f"**Profile:**\n"
+                            f"- Email: {profile.get('email')}\n"
+                            f"- Phone: {profile.get('phone')}\n"
+                            f"- Account Status: {profile.get('account_status')}\n"
+                            f"- Account Type: {profile.get('account_type')}\n"
+                            f"- Total Orders: {profile.get('total_orders')}\n"
+                            f"- Lifetime Value: ${profile.get('lifetime_value')}\n\n"
+                        )
 
                 if "tickets" in result.get("data", {}):
                     tickets = result["data"]["tickets"]
                     if "tickets" in tickets and tickets["tickets"]:
-                        response += f"**Support Tickets ({tickets.get('total_tickets')}):**\n"
-                        for ticket in tickets["tickets"][:5]:  # Show last 5 tickets
-                            response += f"- [{ticket['status'].upper()}] {ticket['title']} (Priority: {ticket['priority']})\n"
+                        parts.append(f"**Support Tickets ({tickets.get('total_tickets')}):**\n")
+                        parts.extend(
+                            f"- [{ticket['status'].upper()}] {ticket['title']} (Priority: {ticket['priority']})\n"
+                            for ticket in tickets["tickets"][:5]  # Show last 5 tickets
+                        )
 
-                return response
+                return "".join(parts)
 
         return "Unable to process query"
 
@@ -3,12 +3,192 @@ Chatbot module combining RAG + LLM for intelligent responses
 Multi-agent system that handles both policy questions and customer queries
 """
 
-from typing import List, Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from backend.rag.rag_pipeline import search_documents
-from backend.db.database import search_customers, get_customer_profile, get_customer_support_tickets
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import ahocorasick
+import numpy as np
+from backend.rag.rag_pipeline import search_documents, embed_query
+from backend.db.database import search_customers, get_customers_by_ids, get_support_tickets_by_customer_ids
+from backend.keywords import compile_keywords
 import os
+import re
+import threading
+import time
+
+
+# Keywords used to classify a query as customer- and/or policy-related
+_CUSTOMER_KEYWORDS = frozenset({
+    "customer", "profile", "order", "ticket", "support", "history", "past", "recent",
+    "account", "contact", "invoice", "purchase", "transaction"
+})
+_POLICY_KEYWORDS = frozenset({
+    "policy", "faq", "return", "refund", "shipping", "payment", "exchange",
+    "warranty", "guarantee", "rules", "guidelines", "terms", "condition",
+    "process", "procedure", "how", "what is", "explain"
+})
+_CUSTOMER_RE = compile_keywords(_CUSTOMER_KEYWORDS)
+_POLICY_RE = compile_keywords(_POLICY_KEYWORDS)
+
+# Inline "[Source N]" / "(Source N)" citations stripped from LLM answers
+_SOURCE_CITE_RE = re.compile(r'\s*[\[\(]Source\s+[^\]\)]*[\]\)]')
+# Longest unfinished "[Source ..." tail held back while streaming
+_CITE_HOLD_CHARS = 64
+_CITE_OPENER_RE = re.compile(r"[\[\(]")
+
+# Runs customer lookups alongside the policy search
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+
+
+# Cached (loaded_at, automaton) used for name detection
+_customer_names_cache: Tuple[float, Optional[ahocorasick.Automaton]] = (0.0, None)
+_customer_names_lock = threading.Lock()
+
+
+def _build_name_automaton(customers: List[Dict[str, Any]]) -> Optional[ahocorasick.Automaton]:
+    """
+    Build an Aho-Corasick automaton mapping each lowercase name to the list of
+    (customer_id, full_name) for every customer with that name.
+    """
+    automaton = ahocorasick.Automaton()
+    for customer in customers:
+        key = customer["name"].lower()
+        entry = (customer["id"], customer["name"])
+        if key in automaton:
+            automaton.get(key).append(entry)
+        else:
+            automaton.add_word(key, [entry])
+    
+    if len(automaton) == 0:
+        return None
+    
+    automaton.make_automaton()
+    return automaton
+
+
+def _get_customer_names(ttl: float = 60) -> Optional[ahocorasick.Automaton]:
+    """
+    Return the automaton that finds customer names in a lowercase query.
+    
+    It is cached at module level and only rebuilt from the database once it
+    is older than ``ttl`` seconds, so customers written by another process
+    (the only writer is seed_sample_data) show up within ``ttl``.
+    
+    Args:
+        ttl: Maximum age of the cached automaton in seconds
+    
+    Returns:
+        Automaton yielding [(customer_id, full_name), ...], or None if there are no names
+    """
+    global _customer_names_cache
+    
+    with _customer_names_lock:
+        loaded_at, automaton = _customer_names_cache
+        if loaded_at and time.monotonic() - loaded_at < ttl:
+            return automaton
+        
+        try:
+            all_customers = search_customers("")  # Get all customers
+        except Exception:
+            return automaton
+        
+        automaton = _build_name_automaton([cust for cust in all_customers if cust.get("name")])
+        _customer_names_cache = (time.monotonic(), automaton)
+        return automaton
+
+
+# Exact-match response cache: (normalized query, collection, n_results, model) -> {"t": stored_at, "result": ...}
+_RESPONSE_CACHE_SIZE = 512
+_RESPONSE_CACHE_TTL = 300  # seconds
+_response_cache: "OrderedDict[Tuple[str, str, int, Any], Dict[str, Any]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _get_cached_response(key: Tuple[str, str, int, Any]) -> Optional[Dict[str, Any]]:
+    """Return a cached generate_answer result if present and not expired."""
+    with _response_cache_lock:
+        hit = _response_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit["t"] >= _RESPONSE_CACHE_TTL:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return hit["result"]
+
+
+def _cache_response(key: Tuple[str, str, int, Any], result: Dict[str, Any]):
+    """Store a generate_answer result, evicting the least recently used entry when full."""
+    with _response_cache_lock:
+        _response_cache[key] = {"t": time.monotonic(), "result": result}
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+# Approximate cache: serves a stored answer when a new query embeds within
+# cosine similarity _SEMANTIC_CACHE_THRESHOLD of a recent one
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+_SEMANTIC_CACHE_SIZE = 256
+_SEMANTIC_CACHE_THRESHOLD = 0.95
+_semantic_embeddings: Optional[np.ndarray] = None  # (size, dim) ring buffer of unit vectors
+_semantic_entries: List[Optional[Dict[str, Any]]] = [None] * _SEMANTIC_CACHE_SIZE
+_semantic_next = 0
+_semantic_lock = threading.Lock()
+
+
+def _embed_for_cache(query: str) -> Optional[np.ndarray]:
+    """Embed a query as a unit vector, or None if embedding fails."""
+    try:
+        vector = np.asarray(embed_query(query), dtype=np.float32)
+    except Exception:
+        return None
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+def _get_semantic_response(embedding: np.ndarray, scope: Tuple[str, int, Any]) -> Optional[Dict[str, Any]]:
+    """Return the cached result of the most similar recent query in the same scope."""
+    with _semantic_lock:
+        if _semantic_embeddings is None:
+            return None
+        similarities = _semantic_embeddings @ embedding
+        now = time.monotonic()
+        for index in np.argsort(similarities)[::-1]:
+            if similarities[index] < _SEMANTIC_CACHE_THRESHOLD:
+                break
+            entry = _semantic_entries[index]
+            if entry and entry["scope"] == scope and now - entry["t"] < _RESPONSE_CACHE_TTL:
+                return entry["result"]
+        return None
+
+
+def _cache_semantic_response(embedding: np.ndarray, scope: Tuple[str, int, Any], result: Dict[str, Any]):
+    """Store a result in the semantic ring buffer, overwriting the oldest slot."""
+    global _semantic_embeddings, _semantic_next
+    
+    with _semantic_lock:
+        if _semantic_embeddings is None or _semantic_embeddings.shape[1] != embedding.shape[0]:
+            _semantic_embeddings = np.zeros((_SEMANTIC_CACHE_SIZE, embedding.shape[0]), dtype=np.float32)
+            _semantic_entries[:] = [None] * _SEMANTIC_CACHE_SIZE
+            _semantic_next = 0
+        _semantic_embeddings[_semantic_next] = embedding
+        _semantic_entries[_semantic_next] = {"t": time.monotonic(), "scope": scope, "result": result}
+        _semantic_next = (_semantic_next + 1) % _SEMANTIC_CACHE_SIZE
+
+
+def invalidate_response_cache():
+    """Clear cached answers (call after documents are added or removed)."""
+    global _semantic_embeddings, _semantic_next
+    
+    with _response_cache_lock:
+        _response_cache.clear()
+    
+    with _semantic_lock:
+        _semantic_embeddings = None
+        _semantic_entries[:] = [None] * _SEMANTIC_CACHE_SIZE
+        _semantic_next = 0
 
 
 def create_chatbot(model: str = "gemini-2.5-flash", temperature: float = 0.7):
@@ -22,6 +202,9 @@ def create_chatbot(model: str = "gemini-2.5-flash", temperature: float = 0.7):
     Returns:
         ChatGoogleGenerativeAI instance
     """
+    # Imported lazily so DB-only callers don't load the LangChain/GenAI stack
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
     api_key = os.getenv("GOOGLE_API_KEY")
     
     if not api_key:
@@ -36,181 +219,200 @@ def create_chatbot(model: str = "gemini-2.5-flash", temperature: float = 0.7):
     )
 
 
-def generate_answer(
-    query: str,
-    llm=None,
-    n_results: int = 5,
-    collection_name: str = "policies_faqs"
-) -> Dict[str, Any]:
+_SYSTEM_PROMPT = """You are a knowledgeable multi-agent customer support assistant for TCS.
+    You have access to:
+    1. Customer database (profiles, orders, support tickets)
+    2. Company policies, FAQs, and guidelines
+    
+    Your role is to answer questions using the provided context from both sources.
+    Always be helpful, accurate, and professional.
+    If information comes from customer data, acknowledge it clearly.
+    If information comes from policies, cite the policy source when relevant."""
+
+_NO_CONTEXT_ANSWER = (
+    "I couldn't find relevant information. Please provide more specific details "
+    "or check your uploaded documents."
+)
+
+
+def _llm_key(llm) -> Any:
+    """Cache-key part identifying the model that answers (None for the default chatbot)."""
+    if llm is None:
+        return None
+    return (type(llm).__name__, getattr(llm, "model", None), getattr(llm, "temperature", None))
+
+
+def _plan_query(query: str, n_results: int, collection_name: str, llm=None) -> Dict[str, Any]:
     """
-    Generate an answer using multi-agent RAG + customer database + LLM.
-    Routes queries to both policy documents and customer database as needed.
+    Classify a query and check the response caches (shared by the plain and streaming paths).
     
     Args:
         query: User's question
-        llm: ChatGoogleGenerativeAI instance (created if not provided)
         n_results: Number of context chunks to retrieve
         collection_name: ChromaDB collection to search
+        llm: Chatbot that will answer (None for the default one)
     
     Returns:
-        Dict with answer, sources, and metadata
+        Dict with the cached result (or None), cache keys, and routing flags
     """
-    if llm is None:
-        llm = create_chatbot()
-    
-    import re
+    # Serve repeated questions from the response cache
+    scope = (collection_name, n_results, _llm_key(llm))
+    cache_key = (query.strip().lower(), *scope)
+    plan = {"cached": None, "cache_key": cache_key, "scope": scope, "query_embedding": None}
+    cached = _get_cached_response(cache_key)
+    if cached is not None:
+        plan["cached"] = {**cached, "query": query}
+        return plan
     
     # Step 1: Detect query type - check if customer names are mentioned
     query_lower = query.lower()
     
-    # Get all customer names from database for matching
-    customer_names = []
-    try:
-        all_customers = search_customers("")  # Get all customers
-        customer_names = [cust.get("name", "").lower() for cust in all_customers]
-    except:
-        pass
-    
-    # Check if any customer names appear in the query
-    is_customer_query = any(name in query_lower for name in customer_names) or any(
-        keyword in query_lower for keyword in [
-            "customer", "profile", "order", "ticket", "support", "history", "past", "recent",
-            "account", "contact", "invoice", "purchase", "transaction"
-        ]
-    )
+    # Get the customer-name automaton (cached) for matching
+    name_automaton = _get_customer_names()
     
-    # Keywords for policy queries
-    policy_keywords = [
-        "policy", "faq", "return", "refund", "shipping", "payment", "exchange",
-        "warranty", "guarantee", "rules", "guidelines", "terms", "condition",
-        "process", "procedure", "how", "what is", "explain"
-    ]
+    # Find actual customer names mentioned in the query (single linear scan,
+    # skipped entirely when there are no customers)
+    mentioned_customer_data = []
+    if name_automaton is not None:
+        mentioned_customer_data = list(dict.fromkeys(
+            entry for _, entries in name_automaton.iter(query_lower) for entry in entries
+        ))
+    
+    # A mentioned name makes this a customer query without checking keywords
+    is_customer_query = bool(mentioned_customer_data) or bool(_CUSTOMER_RE.search(query))
     
-    is_policy_query = any(keyword in query_lower for keyword in policy_keywords)
+    # Check for policy keywords
+    is_policy_query = bool(_POLICY_RE.search(query))
     
     # If no keywords detected, assume it could be either - try customer search first
     if not is_customer_query and not is_policy_query:
         is_customer_query = True
     
-    # Extract customer names from database for smarter matching
-    all_customer_names = []  # Will store (full_name, lowercase_name) tuples
-    try:
-        all_db_customers = search_customers("")  # Get all customers
-        all_customer_names = [(cust.get("name", ""), cust.get("name", "").lower()) for cust in all_db_customers]
-    except:
-        pass
+    plan["mentioned"] = mentioned_customer_data
+    plan["is_customer_query"] = is_customer_query
+    plan["is_policy_query"] = is_policy_query
     
-    # Check if any actual customer names are mentioned in the query
-    mentioned_customer_data = []
-    for full_name, lower_name in all_customer_names:
-        if lower_name and lower_name in query_lower:
-            mentioned_customer_data.append((full_name, lower_name))
+    # Try the semantic cache for rephrased questions. Queries naming a customer
+    # are skipped: they embed close to each other but need different answers.
+    if SEMANTIC_CACHE_ENABLED and not mentioned_customer_data:
+        query_embedding = _embed_for_cache(query)
+        plan["query_embedding"] = query_embedding
+        if query_embedding is not None:
+            cached = _get_semantic_response(query_embedding, scope)
+            if cached is not None:
+                plan["cached"] = {**cached, "query": query}
     
-    # Step 2: Retrieve context from appropriate sources
-    all_context = []
-    all_sources = []
-    source_counter = 1
-    
-    # Retrieve customer database context if relevant
-    customer_context = ""
-    if is_customer_query:
-        try:
-            customer_results = None
+    return plan
+
+
+def _customer_context(query: str, mentioned_customer_data: List[Tuple[int, str]]) -> str:
+    """Build the customer-database context block for a query ("" if nothing matched)."""
+    try:
+        # Priority 1: If actual customer names are mentioned, fetch them all by id
+        if mentioned_customer_data:
+            customer_results = get_customers_by_ids(
+                [customer_id for customer_id, _ in mentioned_customer_data]
+            )
+        else:
+            # Priority 2: Try searching with the full query
+            customer_results = search_customers(query)
+        
+        if not customer_results:
+            return ""
+        
+        # Fetch tickets for every matched customer in one query
+        tickets_by_customer = {}
+        for ticket in get_support_tickets_by_customer_ids([c["id"] for c in customer_results]):
+            tickets_by_customer.setdefault(ticket["customer_id"], []).append(ticket)
+        
+        customer_context = "=== CUSTOMER DATABASE RESULTS ===\n"
+        for customer in customer_results:
+            customer_name = customer.get("name", "")
+            customer_context += f"\nCustomer: {customer_name}\nEmail: {customer.get('email', 'N/A')}\nPhone: {customer.get('phone', 'N/A')}\nAddress: {customer.get('address', 'N/A')}\nAccount Status: {customer.get('account_status', 'N/A')}"
             
-            # Priority 1: If actual customer names are mentioned, search for them
-            if mentioned_customer_data:
-                for full_name, lower_name in mentioned_customer_data:
-                    customer_results = search_customers(full_name)
-                    if customer_results:
-                        break
-            else:
-                # Priority 2: Try searching with the full query
-                customer_results = search_customers(query)
+            tickets = tickets_by_customer.get(customer["id"], [])
+            if tickets:
+                customer_context += f"\n\nSupport Tickets ({len(tickets)}):\n"
+                for ticket in tickets[:3]:  # Limit to 3 most recent
+                    customer_context += f"  - {ticket.get('title', 'N/A')}: {ticket.get('status', 'N/A')}\n"
             
-            if customer_results:
-                customer_context = "=== CUSTOMER DATABASE RESULTS ===\n"
-                for customer in customer_results:
-                    customer_id = customer.get("id", "")
-                    customer_name = customer.get("name", "")
-                    
-                    # Get detailed profile
-                    try:
-                        profile = get_customer_profile(customer_id)
-                        profile_text = f"\nCustomer: {customer_name}\nEmail: {profile.get('email', 'N/A')}\nPhone: {profile.get('phone', 'N/A')}\nAddress: {profile.get('address', 'N/A')}\nAccount Status: {profile.get('account_status', 'N/A')}"
-                    except:
-                        profile_text = f"\nCustomer: {customer_name}"
-                    
-                    customer_context += profile_text
-                    
-                    # Get support tickets
-                    try:
-                        tickets = get_customer_support_tickets(customer_id)
-                        if tickets:
-                            customer_context += f"\n\nSupport Tickets ({len(tickets)}):\n"
-                            for ticket in tickets[:3]:  # Limit to 3 most recent
-                                customer_context += f"  - {ticket.get('subject', 'N/A')}: {ticket.get('status', 'N/A')}\n"
-                    except:
-                        pass
-                    
-                    customer_context += "\n"
-                
-                all_context.append(f"[Source {source_counter}]\n{customer_context.strip()}")
-                all_sources.append({
-                    "id": source_counter,
-                    "filename": "customer_database",
-                    "relevance": "100%",
-                    "type": "customer_data"
-                })
-                source_counter += 1
-        except Exception as e:
-            # If database query fails, continue with policy search
-            pass
-    
-    # Retrieve policy/FAQ context if relevant
-    if is_policy_query:
-        search_results = search_documents(collection_name, query, n_results=n_results)
+            customer_context += "\n"
         
-        if search_results:
-            for result in search_results:
-                content = result.get("content", "")
-                metadata = result.get("metadata", {})
-                similarity = result.get("similarity", 0)
-                
-                all_context.append(f"[Source {source_counter}]\n{content}")
-                
-                filename = metadata.get("filename", "document")
-                if filename.endswith((".txt", ".pdf", ".md")):
-                    filename = filename.rsplit(".", 1)[0]
-                
-                all_sources.append({
-                    "id": source_counter,
-                    "filename": filename,
-                    "relevance": f"{similarity:.0%}",
-                    "type": metadata.get("type", "document")
-                })
-                source_counter += 1
+        return customer_context.strip()
+    except Exception as e:
+        # If database query fails, continue with policy search
+        return ""
+
+
+def _assemble_context(
+    customer_context: str,
+    search_results: List[Dict[str, Any]]
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Number the customer and policy context blocks and build their source entries."""
+    all_context = []
+    all_sources = []
+    source_counter = 1
     
-    # If no context found from any source
-    if not all_context:
-        return {
-            "answer": "I couldn't find relevant information. Please provide more specific details or check your uploaded documents.",
-            "sources": [],
-            "has_context": False,
-            "query": query
-        }
+    if customer_context:
+        all_context.append(f"[Source {source_counter}]\n{customer_context}")
+        all_sources.append({
+            "id": source_counter,
+            "filename": "customer_database",
+            "relevance": "100%",
+            "type": "customer_data"
+        })
+        source_counter += 1
     
-    context = "\n\n".join(all_context)
+    for result in search_results:
+        content = result.get("content", "")
+        metadata = result.get("metadata", {})
+        similarity = result.get("similarity", 0)
+        
+        all_context.append(f"[Source {source_counter}]\n{content}")
+        
+        filename = metadata.get("filename", "document")
+        if filename.endswith((".txt", ".pdf", ".md")):
+            filename = filename.rsplit(".", 1)[0]
+        
+        all_sources.append({
+            "id": source_counter,
+            "filename": filename,
+            "relevance": f"{similarity:.0%}",
+            "type": metadata.get("type", "document")
+        })
+        source_counter += 1
     
-    # Step 3: Create system and user prompts for multi-agent response
-    system_prompt = """You are a knowledgeable multi-agent customer support assistant for TCS.
-    You have access to:
-    1. Customer database (profiles, orders, support tickets)
-    2. Company policies, FAQs, and guidelines
+    return all_context, all_sources
+
+
+def _retrieve_context(
+    plan: Dict[str, Any],
+    query: str,
+    n_results: int,
+    collection_name: str
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Fetch customer and policy context for a planned query and number it.
+    When the query needs both, the customer lookup runs on a worker thread
+    while the policy search runs on this one.
+    """
+    customer_context = ""
+    search_results = []
+    if plan["is_customer_query"] and plan["is_policy_query"]:
+        customer_future = _RETRIEVAL_POOL.submit(_customer_context, query, plan["mentioned"])
+        search_results = search_documents(collection_name, query, n_results=n_results)
+        customer_context = customer_future.result()
+    elif plan["is_customer_query"]:
+        customer_context = _customer_context(query, plan["mentioned"])
+    elif plan["is_policy_query"]:
+        search_results = search_documents(collection_name, query, n_results=n_results)
     
-    Your role is to answer questions using the provided context from both sources.
-    Always be helpful, accurate, and professional.
-    If information comes from customer data, acknowledge it clearly.
-    If information comes from policies, cite the policy source when relevant."""
+    return _assemble_context(customer_context, search_results)
+
+
+def _build_messages(context: str, query: str) -> List[Any]:
+    """Build the system and user prompts for the multi-agent response."""
+    from langchain_core.messages import HumanMessage, SystemMessage
     
     user_prompt = f"""Available Information:
 
@@ -222,31 +424,191 @@ Customer Question: {query}
 
 Please provide a comprehensive answer using any relevant information from the sources above."""
     
-    # Step 4: Generate response using LLM
-    messages = [
-        SystemMessage(content=system_prompt),
+    return [
+        SystemMessage(content=_SYSTEM_PROMPT),
         HumanMessage(content=user_prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
-    answer_text = response.content
+
+
+def _no_context_result(query: str) -> Dict[str, Any]:
+    """
+    Result for queries with no context from any source. Not cached, so the
+    question is retried once documents have been uploaded.
+    """
+    return {
+        "answer": _NO_CONTEXT_ANSWER,
+        "sources": [],
+        "has_context": False,
+        "query": query
+    }
+
+
+def _finish_answer(
+    plan: Dict[str, Any],
+    query: str,
+    answer_text: str,
+    sources: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Strip inline citations from the LLM answer, cache the result, and return it."""
     # Remove inline source citations
-    answer_text = re.sub(r'\s*[\[\(]Source\s+[^\]\)]*[\]\)]', '', answer_text)
+    answer_text = _SOURCE_CITE_RE.sub('', answer_text)
     answer_text = answer_text.strip()
     
-    return {
+    result = {
         "answer": answer_text,
-        "sources": all_sources,
+        "sources": sources,
         "has_context": True,
         "query": query
     }
+    _cache_response(plan["cache_key"], result)
+    if plan["query_embedding"] is not None:
+        _cache_semantic_response(plan["query_embedding"], plan["scope"], result)
+    return result
+
+
+@lru_cache(maxsize=1)
+def _default_llm():
+    """
+    Chatbot shared by calls that don't pass their own llm.
+    Built once per process, so the API key is read and the client (with its
+    connection pool) is set up only on first use; failures are not cached.
+    """
+    return create_chatbot()
+
+
+def generate_answer(
+    query: str,
+    llm=None,
+    n_results: int = 5,
+    collection_name: str = "policies_faqs"
+) -> Dict[str, Any]:
+    """
+    Generate an answer using multi-agent RAG + customer database + LLM.
+    Routes queries to both policy documents and customer database as needed.
+    
+    Args:
+        query: User's question
+        llm: ChatGoogleGenerativeAI instance (created if not provided)
+        n_results: Number of context chunks to retrieve
+        collection_name: ChromaDB collection to search
+    
+    Returns:
+        Dict with answer, sources, and metadata
+    """
+    # Step 1: Classify the query and check the caches
+    plan = _plan_query(query, n_results, collection_name, llm)
+    if plan["cached"] is not None:
+        return plan["cached"]
+    
+    # Step 2: Retrieve context from appropriate sources
+    all_context, all_sources = _retrieve_context(plan, query, n_results, collection_name)
+    
+    # If no context found from any source
+    if not all_context:
+        return _no_context_result(query)
+    
+    # Step 3: Create system and user prompts for multi-agent response
+    messages = _build_messages("\n\n".join(all_context), query)
+    
+    # Step 4: Generate response using LLM
+    if llm is None:
+        llm = _default_llm()
+    
+    response = llm.invoke(messages)
+    
+    return _finish_answer(plan, query, response.content, all_sources)
+
+
+def _stream_holdback(text: str) -> int:
+    """
+    Index up to which streamed text is safe to emit.
+    
+    Trailing whitespace and an unfinished "[Source ..." / "(Source ..." tail are
+    held back, since _SOURCE_CITE_RE may still strip them once more text arrives.
+    The earliest such opener counts, so a bracket nested inside a pending
+    citation ("[Source 1 (see") does not release it.
+    """
+    for opener in _CITE_OPENER_RE.finditer(text, max(0, len(text) - _CITE_HOLD_CHARS)):
+        tail = text[opener.start() + 1:]
+        if "Source".startswith(tail[:6]) and "]" not in tail and ")" not in tail:
+            return len(text[:opener.start()].rstrip())
+    return len(text.rstrip())
+
+
+def _strip_citations_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield streamed answer text with inline source citations removed."""
+    pending = ""
+    started = False
+    for chunk in chunks:
+        pending = _SOURCE_CITE_RE.sub('', pending + chunk)
+        if not started:
+            pending = pending.lstrip()
+        cut = _stream_holdback(pending)
+        if cut:
+            started = True
+            yield pending[:cut]
+            pending = pending[cut:]
+    
+    tail = _SOURCE_CITE_RE.sub('', pending).rstrip()
+    if not started:
+        tail = tail.lstrip()
+    if tail:
+        yield tail
+
+
+def generate_answer_stream(
+    query: str,
+    llm=None,
+    n_results: int = 5,
+    collection_name: str = "policies_faqs"
+) -> Tuple[List[Dict[str, Any]], Iterator[str]]:
+    """
+    Streaming variant of generate_answer.
+    Retrieval happens up front; the answer text is then yielded as the LLM
+    produces it, and the full result is cached once the stream is exhausted.
+    
+    Args:
+        query: User's question
+        llm: ChatGoogleGenerativeAI instance (created if not provided)
+        n_results: Number of context chunks to retrieve
+        collection_name: ChromaDB collection to search
+    
+    Returns:
+        Tuple of (sources, iterator over answer text chunks)
+    """
+    # Step 1: Classify the query and check the caches
+    plan = _plan_query(query, n_results, collection_name, llm)
+    if plan["cached"] is not None:
+        return plan["cached"]["sources"], iter([plan["cached"]["answer"]])
+    
+    # Step 2: Retrieve context from appropriate sources
+    all_context, all_sources = _retrieve_context(plan, query, n_results, collection_name)
+    
+    # If no context found from any source
+    if not all_context:
+        result = _no_context_result(query)
+        return result["sources"], iter([result["answer"]])
+    
+    # Step 3: Create system and user prompts for multi-agent response
+    messages = _build_messages("\n\n".join(all_context), query)
+    
+    # Step 4: Stream the response from the LLM
+    if llm is None:
+        llm = _default_llm()
+    
+    def answer_chunks() -> Iterator[str]:
+        parts = []
+        raw = (chunk.content for chunk in llm.stream(messages) if isinstance(chunk.content, str))
+        for text in _strip_citations_stream(raw):
+            parts.append(text)
+            yield text
+        _finish_answer(plan, query, "".join(parts), all_sources)
+    
+    return all_sources, answer_chunks()
 
 
 if __name__ == "__main__":
     # Test the chatbot
-    import os
-    
     # Make sure API key is set
     if not os.getenv("GOOGLE_API_KEY"):
         print("⚠️  Please set GOOGLE_API_KEY environment variable")
@@ -3,18 +3,138 @@ Database module for customer data and support tickets.
 Uses SQLite for structured data storage.
 """
 
+import atexit
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
 from datetime import datetime, timedelta
 
 DB_PATH = Path(__file__).parent / "customers.db"
 
+# Shared connection reused by all read paths (guarded by _lock). Opened on
+# first use, so importing this module never touches the database file
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+# Ad-hoc queries run on their own connection (guarded by _query_lock, so a slow
+# one never blocks the read paths) whose authorizer only allows reads; each is
+# interrupted once it runs longer than QUERY_TIMEOUT
+_READ_ACTIONS = frozenset({
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+})
+_query_conn: Optional[sqlite3.Connection] = None
+_query_lock = threading.Lock()
+QUERY_TIMEOUT = 5.0  # seconds
+
+
+def _shared_conn() -> sqlite3.Connection:
+    """Return the shared connection, opening it on first use (call with _lock held)."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(
+            DB_PATH, check_same_thread=False, cached_statements=256, isolation_level=None
+        )
+        _conn.row_factory = sqlite3.Row
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute("PRAGMA temp_store=MEMORY")
+        _conn.execute("PRAGMA cache_size=-20000")
+    return _conn
+
+
+def _read_only_conn() -> sqlite3.Connection:
+    """Return the ad-hoc query connection, opening it on first use (call with _query_lock held)."""
+    global _query_conn
+    if _query_conn is None:
+        _query_conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+        _query_conn.row_factory = sqlite3.Row
+        _query_conn.execute("PRAGMA query_only=ON")
+        _query_conn.set_authorizer(
+            lambda action, *args: sqlite3.SQLITE_OK if action in _READ_ACTIONS else sqlite3.SQLITE_DENY
+        )
+    return _query_conn
+
+
+def close():
+    """Close the shared connections (checkpoints the WAL back into the database file)."""
+    global _conn, _query_conn
+    
+    # Stop a running ad-hoc query first so _query_lock is released promptly
+    if _query_conn is not None:
+        _query_conn.interrupt()
+    with _query_lock:
+        if _query_conn is not None:
+            _query_conn.close()
+            _query_conn = None
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+atexit.register(close)
+
+# Hot-path statements, kept as fixed strings so SQLite's statement cache reuses them
+# Profile + orders in one rowset: one row per order (a single row with NULL
+# order columns when the customer has none), newest order first
+_PROFILE_WITH_ORDERS = """
+    SELECT c.*, o.id AS o_id, o.order_date AS o_order_date, o.amount AS o_amount,
+           o.status AS o_status, o.items AS o_items
+    FROM c LEFT JOIN orders o ON o.customer_id = c.id
+    ORDER BY o.order_date DESC
+"""
+SQL_GET_PROFILE = (
+    "WITH c AS (SELECT * FROM customers WHERE name LIKE ? COLLATE NOCASE LIMIT 1)"
+    + _PROFILE_WITH_ORDERS
+)
+SQL_GET_PROFILE_BY_ID = "WITH c AS (SELECT * FROM customers WHERE id = ?)" + _PROFILE_WITH_ORDERS
+SQL_GET_CUSTOMER_ID = "SELECT id FROM customers WHERE name LIKE ? COLLATE NOCASE"
+SQL_GET_TICKETS = "SELECT * FROM support_tickets WHERE customer_id = ? ORDER BY created_date DESC"
+SQL_SEARCH_CUSTOMERS = (
+    "SELECT * FROM customers WHERE name LIKE ?1 COLLATE NOCASE OR email LIKE ?1 OR phone LIKE ?1"
+)
+SQL_LIST_CUSTOMERS = "SELECT * FROM customers ORDER BY id"
+SQL_GET_BUNDLE = """
+    WITH c AS (
+        SELECT * FROM customers WHERE name LIKE ?1 COLLATE NOCASE LIMIT 1
+    )
+    SELECT 'c' AS tag, NULL AS sort_key, json_object(
+        'id', id, 'name', name, 'email', email, 'phone', phone,
+        'signup_date', signup_date, 'account_status', account_status,
+        'account_type', account_type, 'total_orders', total_orders,
+        'lifetime_value', lifetime_value
+    ) AS data FROM c
+    UNION ALL
+    SELECT 'o', o.order_date, json_object(
+        'id', o.id, 'customer_id', o.customer_id, 'order_date', o.order_date,
+        'amount', o.amount, 'status', o.status, 'items', o.items
+    ) FROM orders o JOIN c ON o.customer_id = c.id
+    UNION ALL
+    SELECT 't', t.created_date, json_object(
+        'id', t.id, 'customer_id', t.customer_id, 'title', t.title,
+        'description', t.description, 'status', t.status,
+        'created_date', t.created_date, 'resolved_date', t.resolved_date,
+        'category', t.category, 'priority', t.priority
+    ) FROM support_tickets t JOIN c ON t.customer_id = c.id
+    ORDER BY tag, sort_key DESC
+"""
+# Id lists are bound as one JSON array so the statement text never changes
+SQL_GET_CUSTOMERS_BY_IDS = "SELECT * FROM customers WHERE id IN (SELECT value FROM json_each(?))"
+SQL_GET_TICKETS_BY_CUSTOMER_IDS = (
+    "SELECT * FROM support_tickets WHERE customer_id IN (SELECT value FROM json_each(?)) "
+    "ORDER BY created_date DESC"
+)
+
 
 def init_database():
     """Initialize the SQLite database with customer and ticket tables."""
     conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")  # persistent; readers then never block the writer
     cursor = conn.cursor()
 
     # Create customers table
@@ -61,20 +181,30 @@ def init_database():
         )
     """)
 
+    # Indexes for per-customer ticket/order listings
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tickets_customer ON support_tickets(customer_id, created_date DESC)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id, order_date DESC)"
+    )
+
     conn.commit()
     conn.close()
 
 
-def seed_sample_data():
-    """Seed the database with sample customer data."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def is_seeded() -> bool:
+    """Return True if the sample data is already present (sentinel customer row)."""
+    with _lock:
+        try:
+            row = _shared_conn().execute("SELECT 1 FROM customers WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return False
+    return row is not None
 
-    # Clear existing data
-    cursor.execute("DELETE FROM support_tickets")
-    cursor.execute("DELETE FROM orders")
-    cursor.execute("DELETE FROM customers")
 
+def seed_sample_data():
+    """Seed the database with sample customer data."""
     # Sample customers
     customers = [
         (1, "Ema Johnson", "ema.johnson@email.com", "+1-555-0101", "2023-06-15", "active", "premium", 12, 4500.00),
@@ -84,11 +214,6 @@ def seed_sample_data():
         (5, "Lisa Anderson", "lisa.anderson@email.com", "+1-555-0105", "2022-03-22", "inactive", "standard", 8, 1800.00),
     ]
 
-    cursor.executemany(
-        "INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        customers
-    )
-
     # Sample support tickets for Ema Johnson (customer_id=1)
     today = datetime.now()
     tickets = [
@@ -119,11 +244,6 @@ def seed_sample_data():
         ),
     ]
 
-    cursor.executemany(
-        "INSERT INTO support_tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        tickets
-    )
-
     # Sample orders
     orders = [
         (1, 1, "2024-01-10", 299.99, "delivered", json.dumps(["Wireless Earbuds", "USB Cable"])),
@@ -132,69 +252,89 @@ def seed_sample_data():
         (4, 3, "2024-01-15", 899.99, "processing", json.dumps(["Tablet", "Stylus"])),
     ]
 
-    cursor.executemany(
-        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)",
-        orders
-    )
-
-    conn.commit()
-    conn.close()
+    # Upsert everything in one write transaction (a single journal commit)
+    with _lock:
+        conn = _shared_conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                customers
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO support_tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                tickets
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?)",
+                orders
+            )
+
+
+def _profile_from_rows(rows: List[sqlite3.Row]) -> Dict[str, Any]:
+    """Fold SQL_GET_PROFILE* rows (customer columns + o_* order columns) into a profile dict."""
+    customer_dict = {key: rows[0][key] for key in rows[0].keys() if not key.startswith("o_")}
+    customer_dict["orders"] = [
+        {
+            "id": row["o_id"],
+            "customer_id": customer_dict["id"],
+            "order_date": row["o_order_date"],
+            "amount": row["o_amount"],
+            "status": row["o_status"],
+            "items": row["o_items"]
+        }
+        for row in rows
+        if row["o_id"] is not None
+    ]
+    return customer_dict
 
 
 def get_customer_profile(customer_name: str) -> Dict[str, Any]:
-    """Get customer profile information by name."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    """Get customer profile information (with orders, in one query) by name."""
+    with _lock:
+        rows = _shared_conn().execute(SQL_GET_PROFILE, (f"%{customer_name}%",)).fetchall()
 
-    cursor.execute(
-        "SELECT * FROM customers WHERE LOWER(name) LIKE LOWER(?)",
-        (f"%{customer_name}%",)
-    )
-    customer = cursor.fetchone()
-
-    if not customer:
-        conn.close()
+    if not rows:
         return {"error": f"Customer '{customer_name}' not found"}
 
-    customer_dict = dict(customer)
+    return _profile_from_rows(rows)
 
-    # Fetch related orders
-    cursor.execute(
-        "SELECT * FROM orders WHERE customer_id = ? ORDER BY order_date DESC",
-        (customer_dict["id"],)
-    )
-    customer_dict["orders"] = [dict(row) for row in cursor.fetchall()]
 
-    conn.close()
-    return customer_dict
+def get_customer_profile_by_id(customer_id: int) -> Dict[str, Any]:
+    """Get customer profile information by primary key (no name scan)."""
+    with _lock:
+        rows = _shared_conn().execute(SQL_GET_PROFILE_BY_ID, (customer_id,)).fetchall()
+
+    if not rows:
+        return {"error": f"Customer #{customer_id} not found"}
+
+    return _profile_from_rows(rows)
 
 
 def get_customer_support_tickets(customer_name: str) -> Dict[str, Any]:
     """Get all support tickets for a customer."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with _lock:
+        customer = _shared_conn().execute(SQL_GET_CUSTOMER_ID, (f"%{customer_name}%",)).fetchone()
 
-    cursor.execute(
-        "SELECT id FROM customers WHERE LOWER(name) LIKE LOWER(?)",
-        (f"%{customer_name}%",)
-    )
-    customer = cursor.fetchone()
+        if not customer:
+            return {"error": f"Customer '{customer_name}' not found"}
 
-    if not customer:
-        conn.close()
-        return {"error": f"Customer '{customer_name}' not found"}
+        customer_id = customer["id"]
 
-    customer_id = customer["id"]
+        tickets = [dict(row) for row in _shared_conn().execute(SQL_GET_TICKETS, (customer_id,))]
 
-    cursor.execute(
-        "SELECT * FROM support_tickets WHERE customer_id = ? ORDER BY created_date DESC",
-        (customer_id,)
-    )
-    tickets = [dict(row) for row in cursor.fetchall()]
+    return {
+        "customer_name": customer_name,
+        "customer_id": customer_id,
+        "total_tickets": len(tickets),
+        "tickets": tickets
+    }
 
-    conn.close()
+
+def get_customer_support_tickets_by_id(customer_id: int, customer_name: str = "") -> Dict[str, Any]:
+    """Get all support tickets for a customer by primary key (no name scan)."""
+    with _lock:
+        tickets = [dict(row) for row in _shared_conn().execute(SQL_GET_TICKETS, (customer_id,))]
 
     return {
         "customer_name": customer_name,
@@ -204,40 +344,111 @@ def get_customer_support_tickets(customer_name: str) -> Dict[str, Any]:
     }
 
 
+def get_customer_bundle(customer_name: str) -> Dict[str, Any]:
+    """
+    Get a customer's profile, orders, and support tickets in one query.
+    
+    Args:
+        customer_name: Name (or part of a name) of the customer
+    
+    Returns:
+        Dict with "profile" (as get_customer_profile) and "tickets"
+        (as get_customer_support_tickets)
+    """
+    with _lock:
+        rows = _shared_conn().execute(SQL_GET_BUNDLE, (f"%{customer_name}%",)).fetchall()
+
+    # Partition rows by tag: customer, orders, tickets
+    grouped = {"c": [], "o": [], "t": []}
+    for row in rows:
+        grouped[row["tag"]].append(json.loads(row["data"]))
+
+    if not grouped["c"]:
+        error = {"error": f"Customer '{customer_name}' not found"}
+        return {"profile": error, "tickets": error}
+
+    profile = grouped["c"][0]
+    profile["orders"] = grouped["o"]
+
+    return {
+        "profile": profile,
+        "tickets": {
+            "customer_name": customer_name,
+            "customer_id": profile["id"],
+            "total_tickets": len(grouped["t"]),
+            "tickets": grouped["t"]
+        }
+    }
+
+
+def get_customers_by_ids(customer_ids: List[int]) -> List[Dict[str, Any]]:
+    """Get customer rows for several ids in one query, in the order given."""
+    if not customer_ids:
+        return []
+
+    with _lock:
+        rows = _shared_conn().execute(SQL_GET_CUSTOMERS_BY_IDS, (json.dumps(customer_ids),)).fetchall()
+
+    by_id = {row["id"]: dict(row) for row in rows}
+    return [by_id[cid] for cid in dict.fromkeys(customer_ids) if cid in by_id]
+
+
+def get_support_tickets_by_customer_ids(customer_ids: List[int]) -> List[Dict[str, Any]]:
+    """Get support tickets for several customers in one query, newest first."""
+    if not customer_ids:
+        return []
+
+    with _lock:
+        tickets = [dict(row) for row in _shared_conn().execute(
+            SQL_GET_TICKETS_BY_CUSTOMER_IDS, (json.dumps(customer_ids),)
+        )]
+
+    return tickets
+
+
+def list_customers() -> List[Dict[str, Any]]:
+    """List every customer (no LIKE predicates to evaluate)."""
+    with _lock:
+        return [dict(row) for row in _shared_conn().execute(SQL_LIST_CUSTOMERS)]
+
+
 def search_customers(query: str) -> List[Dict[str, Any]]:
     """Search customers by name, email, or phone."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with _lock:
+        results = [dict(row) for row in _shared_conn().execute(SQL_SEARCH_CUSTOMERS, (f"%{query}%",))]
 
-    cursor.execute(
-        "SELECT * FROM customers WHERE LOWER(name) LIKE LOWER(?) OR email LIKE ? OR phone LIKE ?",
-        (f"%{query}%", f"%{query}%", f"%{query}%")
-    )
-    results = [dict(row) for row in cursor.fetchall()]
-
-    conn.close()
     return results
 
 
-def query_database(sql_query: str) -> List[Dict[str, Any]]:
-    """Execute a custom SQL query on the database."""
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+def query_database(sql_query: str, timeout: float = QUERY_TIMEOUT) -> List[sqlite3.Row]:
+    """
+    Execute a custom SQL query on the database.
 
-        # Only allow SELECT queries for safety
-        if not sql_query.strip().upper().startswith("SELECT"):
-            conn.close()
-            return {"error": "Only SELECT queries are allowed"}
+    Rows are returned as sqlite3.Row mappings (no per-row dict copy); callers
+    convert only the rows they actually serialize.
 
-        cursor.execute(sql_query)
-        results = [dict(row) for row in cursor.fetchall()]
+    Args:
+        sql_query: Read-only SQL (SELECT / WITH ... SELECT)
+        timeout: Seconds after which the query is interrupted
 
-        conn.close()
-        return results
+    Returns:
+        List of rows, or {"error": ...} if the query is rejected, fails, or times out
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        # The authorizer rejects anything but reads, including WITH ... and
+        # stacked statements, so no string inspection is needed here
+        with _query_lock:
+            conn = _read_only_conn()
+            # Polled every 1000 VM instructions; a true return aborts the query
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            try:
+                return conn.execute(sql_query).fetchall()
+            finally:
+                conn.set_progress_handler(None, 0)
     except Exception as e:
+        if time.monotonic() > deadline:
+            return {"error": f"Query exceeded the {timeout:g}s time limit"}
         return {"error": str(e)}
 
 
@@ -0,0 +1,48 @@
+"""
+Keyword matching helpers shared by the router, agents, and chatbot.
+Keyword sets are compiled once into a regex whose alternation is factored
+by leading characters, so each position in the query only tries keywords
+that start with the character found there.
+"""
+
+import re
+from collections import defaultdict
+from typing import Iterable
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation for words, bucketed by first character (recursively)."""
+    buckets = defaultdict(list)
+    has_end = False
+    for word in words:
+        if word:
+            buckets[word[0]].append(word[1:])
+        else:
+            has_end = True
+
+    alternatives = [re.escape(ch) + _trie_pattern(rest) for ch, rest in sorted(buckets.items())]
+    if not alternatives:
+        return ""
+
+    if len(alternatives) == 1 and not has_end:
+        return alternatives[0]
+
+    pattern = "(?:" + "|".join(alternatives) + ")"
+    return pattern + "?" if has_end else pattern
+
+
+def compile_keywords(keywords: Iterable[str]) -> re.Pattern:
+    """
+    Compile keywords into one case-insensitive pattern.
+    
+    Like the ``keyword in text`` checks it replaces, a keyword also matches
+    inside a longer word ("nonrefundable" contains "refund").
+    
+    Args:
+        keywords: Keywords or phrases to match
+    
+    Returns:
+        Compiled pattern; match.group(0) is the (longest) keyword found
+    """
+    words = {keyword.lower() for keyword in keywords}
+    return re.compile(_trie_pattern(words), re.IGNORECASE)
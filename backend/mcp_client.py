@@ -5,189 +5,187 @@ Demonstrates calling various tools on the MCP server
 
 import asyncio
 import json
+import orjson
+import os
+from contextlib import asynccontextmanager
 from mcp.client.stdio import stdio_client, StdioServerParameters
 from mcp import ClientSession
 
 
-async def test_health():
-    """Test health endpoint."""
-    print("\n" + "="*50)
-    print("Testing: Health Check")
-    print("="*50)
-
-    server_params = StdioServerParameters(
-        command="python",
-        args=["backend/mcp_server.py"],
-    )
+def _read_preview(text: str) -> str:
+    """
+    Read the "preview" field the server puts at the top of large tool responses.
+    
+    Args:
+        text: Raw JSON text returned by the tool
+        
+    Returns:
+        The preview string, or "" if the response has none or is not JSON
+    """
+    try:
+        response = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return ""
+    return response.get("preview", "") if isinstance(response, dict) else ""
 
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            result = await session.call_tool("health", {})
-            print(result.content[0].text)
 
+async def test_health(session: ClientSession) -> str:
+    """Test health endpoint."""
+    out = []
+    out.append("\n" + "="*50)
+    out.append("Testing: Health Check")
+    out.append("="*50)
 
-async def test_policy_query():
-    """Test policy query tool."""
-    print("\n" + "="*50)
-    print("Testing: Policy Query")
-    print("="*50)
+    result = await session.call_tool("health", {})
+    out.append(result.content[0].text)
+    return "\n".join(out)
 
-    server_params = StdioServerParameters(
-        command="python",
-        args=["backend/mcp_server.py"],
-    )
 
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
+async def test_policy_query(session: ClientSession) -> str:
+    """Test policy query tool."""
+    out = []
+    out.append("\n" + "="*50)
+    out.append("Testing: Policy Query")
+    out.append("="*50)
 
-            question = "What is the current refund policy?"
-            print(f"\nQuestion: {question}")
+    question = "What is the current refund policy?"
+    out.append(f"\nQuestion: {question}")
 
-            result = await session.call_tool(
-                "query_policy",
-                {"question": question}
-            )
-            response = json.loads(result.content[0].text)
-            print(f"\nAnswer: {response.get('answer', 'No answer')[:200]}...")
-            print(f"Sources: {response.get('sources', [])}")
+    result = await session.call_tool(
+        "query_policy",
+        {"question": question}
+    )
+    response = json.loads(result.content[0].text)
+    out.append(f"\nAnswer: {response.get('answer', 'No answer')[:200]}...")
+    out.append(f"Sources: {response.get('sources', [])}")
+    return "\n".join(out)
 
 
-async def test_customer_query():
+async def test_customer_query(session: ClientSession) -> str:
     """Test customer query tool."""
-    print("\n" + "="*50)
-    print("Testing: Customer Query")
-    print("="*50)
+    out = []
+    out.append("\n" + "="*50)
+    out.append("Testing: Customer Query")
+    out.append("="*50)
 
-    server_params = StdioServerParameters(
-        command="python",
-        args=["backend/mcp_server.py"],
-    )
+    question = "Give me a quick overview of customer Ema Johnson's profile and past support ticket details."
+    out.append(f"\nQuestion: {question}")
 
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-
-            question = "Give me a quick overview of customer Ema Johnson's profile and past support ticket details."
-            print(f"\nQuestion: {question}")
-
-            result = await session.call_tool(
-                "query_customer",
-                {"question": question}
-            )
-            response = json.loads(result.content[0].text)
-
-            if "data" in response:
-                if "profile" in response["data"]:
-                    profile = response["data"]["profile"]
-                    print(f"\n👤 Profile:")
-                    print(f"  - Email: {profile.get('email')}")
-                    print(f"  - Status: {profile.get('account_status')}")
-                    print(f"  - Type: {profile.get('account_type')}")
-                    print(f"  - Orders: {profile.get('total_orders')}")
-                    print(f"  - Lifetime Value: ${profile.get('lifetime_value')}")
-
-                if "tickets" in response["data"]:
-                    tickets = response["data"]["tickets"]
-                    print(f"\n🎫 Support Tickets ({tickets.get('total_tickets')}):")
-                    for ticket in tickets.get('tickets', [])[:3]:
-                        print(f"  - [{ticket['status'].upper()}] {ticket['title']}")
-
-
-async def test_smart_query():
+    result = await session.call_tool(
+        "query_customer",
+        {"question": question}
+    )
+    response = json.loads(result.content[0].text)
+
+    if "data" in response:
+        if "profile" in response["data"]:
+            profile = response["data"]["profile"]
+            out.append(f"\n👤 Profile:")
+            out.append(f"  - Email: {profile.get('email')}")
+            out.append(f"  - Status: {profile.get('account_status')}")
+            out.append(f"  - Type: {profile.get('account_type')}")
+            out.append(f"  - Orders: {profile.get('total_orders')}")
+            out.append(f"  - Lifetime Value: ${profile.get('lifetime_value')}")
+
+        if "tickets" in response["data"]:
+            tickets = response["data"]["tickets"]
+            out.append(f"\n🎫 Support Tickets ({tickets.get('total_tickets')}):")
+            for ticket in tickets.get('tickets', [])[:3]:
+                out.append(f"  - [{ticket['status'].upper()}] {ticket['title']}")
+    return "\n".join(out)
+
+
+async def test_smart_query(session: ClientSession) -> str:
     """Test smart query tool."""
-    print("\n" + "="*50)
-    print("Testing: Smart Query")
-    print("="*50)
-
-    server_params = StdioServerParameters(
-        command="python",
-        args=["backend/mcp_server.py"],
+    out = []
+    out.append("\n" + "="*50)
+    out.append("Testing: Smart Query")
+    out.append("="*50)
+
+    # Policy and customer questions answered in one batched call
+    questions = [
+        "What is the warranty coverage?",
+        "Tell me about Sarah Chen's orders",
+    ]
+
+    result = await session.call_tool(
+        "smart_query_batch",
+        {"questions": questions}
     )
+    responses = json.loads(result.content[0].text)
 
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-
-            # Test policy question
-            question1 = "What is the warranty coverage?"
-            print(f"\nQuery 1: {question1}")
+    for i, (question, response) in enumerate(zip(questions, responses), 1):
+        out.append(f"\nQuery {i}: {question}")
+        out.append(f"Agent Used: {response.get('agent_used')}")
+        out.append(f"Response: {response.get('response')[:150]}...")
+    return "\n".join(out)
 
-            result1 = await session.call_tool(
-                "smart_query",
-                {"question": question1}
-            )
-            response1 = json.loads(result1.content[0].text)
-            print(f"Agent Used: {response1.get('agent_used')}")
-            print(f"Response: {response1.get('response')[:150]}...")
 
-            # Test customer question
-            question2 = "Tell me about Sarah Chen's orders"
-            print(f"\nQuery 2: {question2}")
-
-            result2 = await session.call_tool(
-                "smart_query",
-                {"question": question2}
-            )
-            response2 = json.loads(result2.content[0].text)
-            print(f"Agent Used: {response2.get('agent_used')}")
-            print(f"Response: {response2.get('response')[:150]}...")
-
-
-async def test_get_policy():
+async def test_get_policy(session: ClientSession) -> str:
     """Test get_policy_document tool."""
-    print("\n" + "="*50)
-    print("Testing: Get Policy Document")
-    print("="*50)
-
-    server_params = StdioServerParameters(
-        command="python",
-        args=["backend/mcp_server.py"],
-    )
-
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
+    out = []
+    out.append("\n" + "="*50)
+    out.append("Testing: Get Policy Document")
+    out.append("="*50)
 
-            policy = "refund_policy"
-            print(f"\nRetrieving: {policy}")
+    policy = "refund_policy"
+    out.append(f"\nRetrieving: {policy}")
 
-            result = await session.call_tool(
-                "get_policy_document",
-                {"policy_name": policy}
-            )
-            response = json.loads(result.content[0].text)
-            print(f"\nContent: {response.get('content', '')[:300]}...")
-
-
-async def test_search_customers():
-    """Test search_customer_database tool."""
-    print("\n" + "="*50)
-    print("Testing: Search Customers")
-    print("="*50)
-
-    server_params = StdioServerParameters(
-        command="python",
-        args=["backend/mcp_server.py"],
+    result = await session.call_tool(
+        "get_policy_document",
+        {"policy_name": policy}
     )
+    # Policy documents can be large; only the leading preview is decoded
+    out.append(f"\nContent: {_read_preview(result.content[0].text)}...")
+    return "\n".join(out)
 
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
 
-            query = "Ema"
-            print(f"\nSearching for: {query}")
+async def test_search_customers(session: ClientSession) -> str:
+    """Test search_customer_database tool."""
+    out = []
+    out.append("\n" + "="*50)
+    out.append("Testing: Search Customers")
+    out.append("="*50)
 
-            result = await session.call_tool(
-                "search_customer_database",
-                {"query": query}
-            )
-            response = json.loads(result.content[0].text)
-            print(f"Found {response.get('results_count')} results")
+    query = "Ema"
+    out.append(f"\nSearching for: {query}")
 
-            for customer in response.get('results', []):
-                print(f"  - {customer['name']} ({customer['email']})")
+    result = await session.call_tool(
+        "search_customer_database",
+        {"query": query}
+    )
+    response = json.loads(result.content[0].text)
+    out.append(f"Found {response.get('results_count')} results")
+
+    for customer in response.get('results', []):
+        out.append(f"  - {customer['name']} ({customer['email']})")
+    return "\n".join(out)
+
+
+@asynccontextmanager
+async def open_server_streams():
+    """
+    Connect to the MCP server.
+    
+    Uses the already-running server at MCP_SERVER_URL (streamable-http) when
+    set, otherwise spawns backend/mcp_server.py over stdio.
+    
+    Yields:
+        (read, write) streams for a ClientSession
+    """
+    server_url = os.getenv("MCP_SERVER_URL")
+    if server_url:
+        # Imported here: the streamable-http client only exists from mcp 1.8
+        from mcp.client.streamable_http import streamablehttp_client
+        async with streamablehttp_client(server_url) as (read, write, _):
+            yield read, write
+    else:
+        server_params = StdioServerParameters(
+            command="python",
+            args=["backend/mcp_server.py"],
+        )
+        async with stdio_client(server_params) as (read, write):
+            yield read, write
 
 
 async def main():
@@ -197,12 +195,23 @@ async def main():
     print("🚀 "*25)
 
     try:
-        await test_health()
-        await test_policy_query()
-        await test_customer_query()
-        await test_smart_query()
-        await test_get_policy()
-        await test_search_customers()
+        # One server connection and MCP handshake shared by every test
+        async with open_server_streams() as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+
+                # Tests are independent, so run them concurrently on the
+                # shared session and print their output in a stable order
+                outputs = await asyncio.gather(
+                    test_health(session),
+                    test_policy_query(session),
+                    test_customer_query(session),
+                    test_smart_query(session),
+                    test_get_policy(session),
+                    test_search_customers(session),
+                )
+                for output in outputs:
+                    print(output)
 
         print("\n" + "="*50)
         print("✅ All tests completed!")
@@ -4,17 +4,22 @@ Provides tools for policy RAG and customer data queries
 """
 
 from mcp.server.fastmcp import FastMCP
-import json
+import asyncio
+import functools
+import orjson
+import os
+import sqlite3
 from datetime import datetime
 import sys
 from pathlib import Path
+from typing import Any, Dict, List
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from backend.agents.agents import orchestrator, PolicyAgent, CustomerAgent
 from backend.db.database import (
     init_database,
+    is_seeded,
     seed_sample_data,
     get_customer_profile,
     get_customer_support_tickets,
@@ -24,23 +29,73 @@ from backend.db.database import (
 from backend.rag.rag_pipeline import (
     query_policy_documents,
     get_policy_summary,
-    create_sample_policy_documents
+    seed_sample_documents
 )
 
-# Initialize MCP server
-mcp = FastMCP("TCS Multi-Agent GenAI Server")
+# Initialize MCP server (host/port only apply to the streamable-http transport)
+mcp = FastMCP(
+    "TCS Multi-Agent GenAI Server",
+    host=os.getenv("MCP_SERVER_HOST", "localhost"),
+    port=int(os.getenv("MCP_SERVER_PORT", "5000"))
+)
+
+
+@functools.cache
+def _orch():
+    """Import and return the agent orchestrator on first use (keeps startup light)."""
+    from backend.agents.agents import orchestrator
+    return orchestrator
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback: sqlite rows become dicts, anything else str()."""
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    return str(obj)
+
+
+# Pretty-print tool responses only when debugging; compact JSON otherwise
+MCP_DEBUG = os.getenv("MCP_DEBUG", "false").lower() in ("1", "true", "yes")
+
+
+def _dumps(payload: Any, indent: bool = True) -> str:
+    """Serialize a tool response to JSON with orjson (indented only under MCP_DEBUG)."""
+    option = orjson.OPT_INDENT_2 if indent and MCP_DEBUG else 0
+    return orjson.dumps(payload, default=_json_default, option=option).decode()
 
-# Initialize database and RAG on startup
+
+# Characters in the "preview" field that leads large tool responses
+_PREVIEW_CHARS = 200
+
+# Characters per get_policy_document chunk
+_POLICY_CHUNK_CHARS = 20000
+
+
+def _page(items: List[Any], page: int, page_size: int) -> Dict[str, Any]:
+    """Slice one page out of a result list and describe where it sits."""
+    page = max(page, 0)
+    page_size = max(page_size, 1)
+    start = page * page_size
+    return {
+        "page": page,
+        "page_size": page_size,
+        "has_more": start + page_size < len(items),
+        "results": items[start:start + page_size]
+    }
+
+
+# Initialize database and RAG on startup (skip seeding when data already exists)
 try:
     init_database()
-    seed_sample_data()
+    if not is_seeded():
+        seed_sample_data()
     print("✓ Database initialized", file=__import__("sys").stderr)
 except Exception as e:
     print(f"✗ Database initialization error: {e}", file=__import__("sys").stderr)
 
 try:
-    create_sample_policy_documents()
-    print("✓ Policy documents created", file=__import__("sys").stderr)
+    seed_sample_documents()
+    print("✓ Policy collection ready", file=__import__("sys").stderr)
 except Exception as e:
     print(f"✗ RAG initialization error: {e}", file=__import__("sys").stderr)
 
@@ -48,16 +103,16 @@ except Exception as e:
 @mcp.tool()
 def health() -> str:
     """Health check endpoint."""
-    return json.dumps({
+    return _dumps({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "TCS Multi-Agent GenAI Server",
         "version": "1.0.0"
-    })
+    }, indent=False)
 
 
 @mcp.tool()
-def query_policy(question: str) -> str:
+async def query_policy(question: str) -> str:
     """
     Query policy documents using RAG.
     
@@ -68,19 +123,20 @@ def query_policy(question: str) -> str:
         JSON response with answer and sources
     """
     try:
-        result = orchestrator.policy_agent.process_query(question)
-        return json.dumps(result, indent=2)
+        result = await asyncio.to_thread(lambda: _orch().policy_agent.process_query(question))
+        text = result.get("answer") or result.get("content") or ""
+        return _dumps({"preview": text[:_PREVIEW_CHARS], **result})
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "type": "policy_query",
             "question": question,
             "timestamp": datetime.now().isoformat()
-        })
+        }, indent=False)
 
 
 @mcp.tool()
-def query_customer(question: str) -> str:
+async def query_customer(question: str) -> str:
     """
     Query customer data from SQL database.
     Retrieves customer profiles and support tickets.
@@ -92,19 +148,19 @@ def query_customer(question: str) -> str:
         JSON response with customer information
     """
     try:
-        result = orchestrator.customer_agent.process_query(question)
-        return json.dumps(result, indent=2, default=str)
+        result = await asyncio.to_thread(lambda: _orch().customer_agent.process_query(question))
+        return _dumps(result)
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "type": "customer_query",
             "question": question,
             "timestamp": datetime.now().isoformat()
-        })
+        }, indent=False)
 
 
 @mcp.tool()
-def get_customer_info(customer_name: str) -> str:
+async def get_customer_info(customer_name: str) -> str:
     """
     Get detailed customer profile information.
     
@@ -115,21 +171,21 @@ def get_customer_info(customer_name: str) -> str:
         JSON with customer profile and orders
     """
     try:
-        profile = get_customer_profile(customer_name)
-        return json.dumps({
+        profile = await asyncio.to_thread(get_customer_profile, customer_name)
+        return _dumps({
             "customer": customer_name,
             "profile": profile,
             "timestamp": datetime.now().isoformat()
-        }, indent=2, default=str)
+        })
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "customer": customer_name
-        })
+        }, indent=False)
 
 
 @mcp.tool()
-def get_customer_tickets(customer_name: str) -> str:
+async def get_customer_tickets(customer_name: str) -> str:
     """
     Get support tickets for a customer.
     
@@ -140,47 +196,49 @@ def get_customer_tickets(customer_name: str) -> str:
         JSON with support ticket history
     """
     try:
-        tickets = get_customer_support_tickets(customer_name)
-        return json.dumps({
+        tickets = await asyncio.to_thread(get_customer_support_tickets, customer_name)
+        return _dumps({
             "customer": customer_name,
             "tickets": tickets,
             "timestamp": datetime.now().isoformat()
-        }, indent=2, default=str)
+        })
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "customer": customer_name
-        })
+        }, indent=False)
 
 
 @mcp.tool()
-def search_customer_database(query: str) -> str:
+async def search_customer_database(query: str, page_size: int = 100, page: int = 0) -> str:
     """
     Search customers by name, email, or phone.
     
     Args:
         query: Search term (name, email, or phone)
+        page_size: Maximum number of customers to return
+        page: Zero-based page of results to return
         
     Returns:
-        JSON with matching customers
+        JSON with one page of matching customers
     """
     try:
-        results = search_customers(query)
-        return json.dumps({
+        results = await asyncio.to_thread(search_customers, query)
+        return _dumps({
             "query": query,
             "results_count": len(results),
-            "results": results,
+            **_page(results, page, page_size),
             "timestamp": datetime.now().isoformat()
-        }, indent=2, default=str)
+        })
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "query": query
-        })
+        }, indent=False)
 
 
 @mcp.tool()
-def get_policy_document(policy_name: str) -> str:
+async def get_policy_document(policy_name: str, chunk_index: int = 0) -> str:
     """
     Retrieve a full policy document.
     
@@ -191,43 +249,45 @@ def get_policy_document(policy_name: str) -> str:
     - privacy_policy
     - terms_of_service
     
+    Long documents are returned in parts; fetch chunk_index 0..total_chunks-1.
+    
     Args:
         policy_name: Name of the policy (without .txt)
+        chunk_index: Zero-based part of the document to return
         
     Returns:
-        Policy document content
+        Policy document content (one part)
     """
     try:
-        content = get_policy_summary(policy_name)
-        return json.dumps({
+        content = await asyncio.to_thread(get_policy_summary, policy_name)
+        content = content if isinstance(content, str) else str(content)
+        total_chunks = max(1, -(-len(content) // _POLICY_CHUNK_CHARS))
+        chunk_index = max(chunk_index, 0)
+        start = chunk_index * _POLICY_CHUNK_CHARS
+        return _dumps({
+            "preview": content[start:start + _PREVIEW_CHARS],
             "policy": policy_name,
-            "content": content,
+            "content": content[start:start + _POLICY_CHUNK_CHARS],
+            "chunk_index": chunk_index,
+            "total_chunks": total_chunks,
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        })
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "policy": policy_name
-        })
+        }, indent=False)
 
 
-@mcp.tool()
-def smart_query(question: str) -> str:
-    """
-    Smart query router - automatically determines if question is about
-    policies or customer data and routes accordingly.
-    
-    Args:
-        question: Any question about policies or customers
-        
-    Returns:
-        Formatted response from appropriate agent
-    """
+def _smart_query_result(question: str) -> Dict[str, Any]:
+    """Route one question and build the smart_query response payload."""
     try:
-        result = orchestrator.route_query(question)
-        response = orchestrator.process(question)
+        routed = _orch().process_with_route(question)
+        result = routed["result"]
+        response = routed["response"]
         
-        return json.dumps({
+        return {
+            "preview": response[:_PREVIEW_CHARS],
             "question": question,
             "agent_used": result.get("agent"),
             "response": response,
@@ -235,46 +295,89 @@ def smart_query(question: str) -> str:
                 "type": result.get("type"),
                 "timestamp": datetime.now().isoformat()
             }
-        }, indent=2, default=str)
+        }
     except Exception as e:
-        return json.dumps({
+        return {
             "error": str(e),
             "question": question,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+
+
+@mcp.tool()
+async def smart_query(question: str) -> str:
+    """
+    Smart query router - automatically determines if question is about
+    policies or customer data and routes accordingly.
+    
+    Args:
+        question: Any question about policies or customers
+        
+    Returns:
+        Formatted response from appropriate agent
+    """
+    result = await asyncio.to_thread(_smart_query_result, question)
+    if "error" in result:
+        return _dumps(result, indent=False)
+    return _dumps(result)
+
+
+@mcp.tool()
+async def smart_query_batch(questions: List[str]) -> str:
+    """
+    Answer several questions in one call, routing each like smart_query.
+    Questions are processed concurrently in worker threads.
+    
+    Args:
+        questions: List of questions about policies or customers
+        
+    Returns:
+        JSON list with one smart_query response per question, in order
+    """
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_smart_query_result, question) for question in questions)
+    )
+    return _dumps(results)
 
 
 @mcp.tool()
-def execute_sql_query(sql_query: str) -> str:
+async def execute_sql_query(sql_query: str, page_size: int = 100, page: int = 0) -> str:
     """
     Execute a SELECT query on the customer database.
     Only SELECT queries are allowed for security.
     
     Args:
         sql_query: SELECT query to execute
+        page_size: Maximum number of rows to return
+        page: Zero-based page of rows to return
         
     Returns:
-        Query results as JSON
+        Query results as JSON (one page of rows)
     """
     try:
-        if not sql_query.strip().upper().startswith("SELECT"):
-            return json.dumps({
-                "error": "Only SELECT queries are allowed"
-            })
-
-        results = query_database(sql_query)
-        return json.dumps({
+        results = await asyncio.to_thread(query_database, sql_query)
+        if not isinstance(results, list):
+            return _dumps({"query": sql_query, **results}, indent=False)
+        return _dumps({
             "query": sql_query,
-            "results_count": len(results) if isinstance(results, list) else 0,
-            "results": results,
+            "results_count": len(results),
+            **_page(results, page, page_size),
             "timestamp": datetime.now().isoformat()
-        }, indent=2, default=str)
+        })
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": str(e),
             "query": sql_query
-        })
+        }, indent=False)
 
 
 if __name__ == "__main__":
-    mcp.run()
+    # Faster event loop for the stdio transport where available (not on Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    # stdio (default) spawns one server per client; streamable-http keeps one
+    # long-lived server that many clients/test runs can share
+    mcp.run(transport=os.getenv("MCP_TRANSPORT", "stdio"))
@@ -4,29 +4,57 @@ Uses ChromaDB for vector storage and document retrieval
 """
 
 import chromadb
+from chromadb.utils import embedding_functions
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from rank_bm25 import BM25Okapi
+from functools import lru_cache
+import hashlib
+import re
+import time
+import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
 
-# ChromaDB client
-client = chromadb.Client()
+# ChromaDB storage
 CHROMA_DB_PATH = Path(__file__).parent / "chroma_db"
 CHROMA_DB_PATH.mkdir(exist_ok=True)
 
-# Initialize persistent client
+# Initialize persistent client (one per process, shared by every caller)
 persistent_client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
 
+# Same embedding model Chroma uses for collections created without an explicit one
+embedding_function = embedding_functions.DefaultEmbeddingFunction()
+
+# Chunk splitter shared by every ingest call
+_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=1000,
+    chunk_overlap=200,
+    separators=["\n\n", "\n", " ", ""]
+)
+
+# Collection handles by name, so hot paths skip the metadata round-trip
+_COLLECTIONS: Dict[str, Any] = {}
+
+# Keyword (BM25) index per collection as (index, chunk ids, chunk count, built_at),
+# built from the stored chunks on first search. Dropped when this process changes
+# the collection, and rebuilt when the chunk count differs or it is older than
+# _SEARCH_TTL, so uploads made by another process (Streamlit vs. MCP server) show up
+_BM25: Dict[str, Tuple[BM25Okapi, List[str], int, float]] = {}
+_BM25_CANDIDATES = 50
+_SEARCH_TTL = 60  # seconds
+_TOKEN_RE = re.compile(r"\w+")
+
 
 def create_collection(collection_name: str):
     """Create or get a ChromaDB collection."""
-    try:
-        collection = persistent_client.get_collection(name=collection_name)
-    except:
-        collection = persistent_client.create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+    if collection_name in _COLLECTIONS:
+        return _COLLECTIONS[collection_name]
+    collection = persistent_client.get_or_create_collection(
+        name=collection_name,
+        metadata={"hnsw:space": "cosine"}
+    )
+    _COLLECTIONS[collection_name] = collection
     return collection
 
 
@@ -34,30 +62,48 @@ def add_documents(collection_name: str, documents: List[Dict[str, str]]):
     """
     Add documents to ChromaDB collection.
     
+    Documents whose content hash matches what is already stored are skipped;
+    changed documents have their old chunks replaced.
+    
     Args:
         collection_name: Name of the collection
         documents: List of dicts with 'id', 'content', and optionally 'metadata'
+    
+    Returns:
+        Number of chunks embedded and added
     """
     collection = create_collection(collection_name)
     
-    # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        separators=["\n\n", "\n", " ", ""]
-    )
+    # Content hash already stored for each incoming doc_id
+    doc_ids = [doc.get("id", "") for doc in documents]
+    stored_hashes = {}
+    if doc_ids:
+        existing = collection.get(
+            where={"doc_id": {"$in": doc_ids}},
+            include=["metadatas"]
+        )
+        for metadata in existing["metadatas"] or []:
+            stored_hashes[metadata.get("doc_id")] = metadata.get("content_hash")
     
     all_chunks = []
     chunk_ids = []
     chunk_metadatas = []
+    stale_doc_ids = []
     
     for doc in documents:
         doc_id = doc.get("id", "")
         content = doc.get("content", "")
         metadata = doc.get("metadata", {})
         
+        # Skip unchanged documents; replace the chunks of changed ones
+        content_hash = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        if doc_id in stored_hashes:
+            if stored_hashes[doc_id] == content_hash:
+                continue
+            stale_doc_ids.append(doc_id)
+        
         # Split content into chunks
-        chunks = text_splitter.split_text(content)
+        chunks = _SPLITTER.split_text(content)
         
         for i, chunk in enumerate(chunks):
             all_chunks.append(chunk)
@@ -65,20 +111,170 @@ def add_documents(collection_name: str, documents: List[Dict[str, str]]):
             chunk_metadatas.append({
                 "doc_id": doc_id,
                 "chunk_index": i,
+                "content_hash": content_hash,
                 **metadata
             })
     
-    # Add to collection
+    if stale_doc_ids:
+        collection.delete(where={"doc_id": {"$in": stale_doc_ids}})
+        _BM25.pop(collection_name, None)
+        _cached_search.cache_clear()
+    
+    # Embed every new or changed chunk in one batched pass, then add to collection
     if all_chunks:
         collection.add(
             ids=chunk_ids,
             documents=all_chunks,
-            metadatas=chunk_metadatas
+            metadatas=chunk_metadatas,
+            embeddings=embed_documents(all_chunks)
         )
+        _BM25.pop(collection_name, None)
+        _cached_search.cache_clear()
     
     return len(all_chunks)
 
 
+def embed_documents(texts: List[str]) -> List[List[float]]:
+    """Embed a batch of document chunks with the search model in a single call."""
+    return [[float(x) for x in emb] for emb in embedding_function(texts)]
+
+
+@lru_cache(maxsize=2048)
+def _embed_query_cached(query: str) -> Tuple[float, ...]:
+    """
+    Embed a query once per distinct string (tuple so the cache can hold it).
+    Shared by document search and the chatbot's semantic cache, so the same
+    phrasing is embedded once per process whichever page asks first.
+    """
+    return tuple(float(x) for x in embedding_function([query])[0])
+
+
+def embed_query(query: str) -> List[float]:
+    """Embed a query with the same model used for document search."""
+    return list(_embed_query_cached(query))
+
+
+@lru_cache(maxsize=512)
+def _cached_search(
+    collection_name: str,
+    query: str,
+    n_results: int,
+    count: int,
+    epoch: int
+) -> Tuple[Tuple[str, float, Tuple[Tuple[str, Any], ...]], ...]:
+    """
+    Run a search once per (collection, query, n_results); results are frozen tuples.
+    The collection's chunk count and a _SEARCH_TTL time bucket are part of the
+    key, so entries go stale when another process changes the collection.
+    """
+    collection = create_collection(collection_name)
+    query_embedding = embed_query(query)
+    
+    # Step 1: Rerank the BM25 candidates densely when the query has keyword hits
+    candidate_ids = _bm25_candidates(collection_name, query)
+    if candidate_ids:
+        return _rerank_candidates(collection, query_embedding, candidate_ids, n_results)
+    
+    # Step 2: Otherwise fall back to the ANN index over the whole collection
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=n_results
+    )
+    
+    if not results["documents"]:
+        return ()
+    return _freeze_hits(results, 0)
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase word tokens for the BM25 index."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _bm25_candidates(collection_name: str, query: str) -> List[str]:
+    """
+    Ids of the top BM25 chunks for a query.
+    
+    Args:
+        collection_name: Name of the collection
+        query: Search query
+    
+    Returns:
+        Up to _BM25_CANDIDATES chunk ids, or [] when no chunk shares a term
+        with the query (the caller then searches the whole collection)
+    """
+    collection = create_collection(collection_name)
+    count = collection.count()
+    built = _BM25.get(collection_name)
+    if built is None or built[2] != count or time.monotonic() - built[3] >= _SEARCH_TTL:
+        stored = collection.get(include=["documents"])
+        if not stored["ids"]:
+            _BM25.pop(collection_name, None)
+            return []
+        built = (
+            BM25Okapi([_tokenize(doc or "") for doc in stored["documents"]]),
+            stored["ids"],
+            len(stored["ids"]),
+            time.monotonic()
+        )
+        _BM25[collection_name] = built
+    index, ids = built[0], built[1]
+    
+    # Score zero is not "no match": Okapi IDF is ~0 for terms in half the chunks
+    tokens = [token for token in _tokenize(query) if token in index.idf]
+    if not tokens:
+        return []
+    scores = index.get_scores(tokens)
+    top = np.argsort(scores)[::-1][:_BM25_CANDIDATES]
+    return [ids[i] for i in top]
+
+
+def _rerank_candidates(
+    collection,
+    query_embedding: List[float],
+    candidate_ids: List[str],
+    n_results: int
+) -> Tuple[Tuple[str, float, Tuple[Tuple[str, Any], ...]], ...]:
+    """Score candidate chunks by cosine similarity to the query and keep the best n_results."""
+    stored = collection.get(ids=candidate_ids, include=["documents", "metadatas", "embeddings"])
+    if not stored["ids"]:
+        return ()
+    
+    embeddings = np.asarray(stored["embeddings"], dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+    query = np.asarray(query_embedding, dtype=np.float32)
+    similarities = embeddings @ (query / (np.linalg.norm(query) + 1e-12))
+    
+    top = np.argsort(similarities)[::-1][:n_results]
+    return tuple(
+        (stored["documents"][i], float(similarities[i]), tuple((stored["metadatas"][i] or {}).items()))
+        for i in top
+    )
+
+
+def _freeze_hits(results: Dict[str, Any], i: int) -> Tuple[Tuple[str, float, Tuple[Tuple[str, Any], ...]], ...]:
+    """Turn the i-th query's Chroma results into (content, similarity, metadata items) tuples."""
+    # Convert distance to similarity (cosine distance to similarity)
+    return tuple(
+        (doc, 1 - distance, tuple((metadata or {}).items()))
+        for doc, distance, metadata in zip(
+            results["documents"][i], results["distances"][i], results["metadatas"][i]
+        )
+    )
+
+
+def _format_hits(hits) -> List[Dict[str, Any]]:
+    """Fresh result dicts from frozen hits (so callers can't mutate a cached entry)."""
+    return [
+        {
+            "content": doc,
+            "similarity": similarity,
+            "metadata": dict(metadata)
+        }
+        for doc, similarity, metadata in hits
+    ]
+
+
 def search_documents(
     collection_name: str,
     query: str,
@@ -95,38 +291,20 @@ def search_documents(
     Returns:
         List of matching documents with scores
     """
-    collection = create_collection(collection_name)
-    
-    results = collection.query(
-        query_texts=[query],
-        n_results=n_results
-    )
-    
-    # Format results
-    formatted_results = []
-    if results["documents"] and len(results["documents"]) > 0:
-        docs = results["documents"][0]
-        distances = results["distances"][0]
-        metadatas = results["metadatas"][0]
-        
-        for doc, distance, metadata in zip(docs, distances, metadatas):
-            # Convert distance to similarity (cosine distance to similarity)
-            similarity = 1 - distance
-            formatted_results.append({
-                "content": doc,
-                "similarity": similarity,
-                "metadata": metadata
-            })
-    
-    return formatted_results
+    count = create_collection(collection_name).count()
+    epoch = int(time.monotonic() // _SEARCH_TTL)
+    return _format_hits(_cached_search(collection_name, query, n_results, count, epoch))
 
 
 def delete_collection(collection_name: str):
     """Delete a ChromaDB collection."""
+    _COLLECTIONS.pop(collection_name, None)
+    _BM25.pop(collection_name, None)
+    _cached_search.cache_clear()
     try:
         persistent_client.delete_collection(name=collection_name)
         return True
-    except:
+    except Exception:
         return False
 
 
@@ -136,7 +314,7 @@ def clear_collection(collection_name: str):
         delete_collection(collection_name)
         create_collection(collection_name)
         return True
-    except:
+    except Exception:
         return False
 
 
@@ -149,7 +327,7 @@ def get_collection_info(collection_name: str) -> Dict[str, Any]:
             "count": collection.count(),
             "exists": True
         }
-    except:
+    except Exception:
         return {
             "name": collection_name,
             "count": 0,
@@ -157,6 +335,95 @@ def get_collection_info(collection_name: str) -> Dict[str, Any]:
         }
 
 
+def _join_chunks(chunks: List[str]) -> str:
+    """
+    Rejoin a document's chunks in order. Text a chunk repeats from the one
+    before (the splitter's chunk_overlap, up to 200 chars) is dropped; overlaps
+    under 20 chars are treated as chance matches and the chunks joined by a newline.
+    """
+    text = ""
+    for chunk in chunks:
+        overlap = next(
+            (k for k in range(min(len(text), len(chunk), 200), 19, -1) if text.endswith(chunk[:k])),
+            0
+        )
+        if not text:
+            text = chunk
+        elif overlap:
+            text += chunk[overlap:]
+        else:
+            text += "\n" + chunk
+    return text
+
+
+def get_policy_summary(policy_name: str, collection_name: str = "policies_faqs") -> str:
+    """
+    Get the text of the uploaded document that best matches a policy name.
+    
+    Args:
+        policy_name: Policy name such as "refund_policy"
+        collection_name: Name of the collection
+    
+    Returns:
+        The document's full text, or a message if nothing has been uploaded
+    """
+    title = policy_name.replace("_", " ")
+    hits = search_documents(collection_name, title, n_results=1)
+    if not hits:
+        return f"No {title} document has been uploaded."
+    
+    doc_id = hits[0]["metadata"].get("doc_id")
+    if doc_id is None:
+        return hits[0]["content"]
+    
+    stored = create_collection(collection_name).get(
+        where={"doc_id": doc_id},
+        include=["documents", "metadatas"]
+    )
+    chunks = sorted(
+        zip(stored["metadatas"], stored["documents"]),
+        key=lambda pair: pair[0].get("chunk_index", 0)
+    )
+    return _join_chunks([doc for _, doc in chunks])
+
+
+def query_policy_documents(
+    question: str,
+    top_k: int = 3,
+    collection_name: str = "policies_faqs"
+) -> Dict[str, Any]:
+    """
+    Answer a policy question with the most relevant document chunks.
+    
+    Args:
+        question: Question about company policies
+        top_k: Number of chunks to return
+        collection_name: Name of the collection
+    
+    Returns:
+        Dict with the question, the matching text as the answer, and its sources
+    """
+    hits = search_documents(collection_name, question, n_results=top_k)
+    if not hits:
+        return {
+            "question": question,
+            "answer": "No relevant policy documents found.",
+            "sources": []
+        }
+    
+    return {
+        "question": question,
+        "answer": "\n\n".join(hit["content"] for hit in hits),
+        "sources": [
+            {
+                "filename": hit["metadata"].get("filename", "document"),
+                "similarity": hit["similarity"]
+            }
+            for hit in hits
+        ]
+    }
+
+
 def seed_sample_documents():
     """Initialize collections without seeding samples (user uploads documents)."""
     create_collection("policies_faqs")
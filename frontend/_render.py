@@ -0,0 +1,82 @@
+"""
+Shared Streamlit rendering for customer profiles and support tickets
+"""
+
+from typing import Dict, Any, Optional
+
+import streamlit as st
+
+
+def render_profile(profile: Dict[str, Any]):
+    """
+    Render a customer profile (metrics, contact, stats and orders).
+
+    Args:
+        profile: Result of get_customer_profile()
+    """
+    if not profile or "error" in profile:
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Customer ID", profile.get("id", "N/A"))
+    with col2:
+        st.metric("Email", profile.get("email", "N/A"))
+    with col3:
+        st.metric("Status", profile.get("account_status", "N/A"))
+    with col4:
+        st.metric("Account Type", profile.get("account_type", "N/A"))
+    st.divider()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Contact")
+        st.write(f"Phone: {profile.get('phone', 'N/A')}")
+        st.write(f"Since: {profile.get('signup_date', 'N/A')}")
+    with col2:
+        st.subheader("Stats")
+        st.write(f"Total Orders: {profile.get('total_orders', 0)}")
+        st.write(f"Lifetime Value: ${profile.get('lifetime_value', 0):.2f}")
+    if profile.get("orders"):
+        st.divider()
+        st.subheader("Orders")
+        # One table element instead of a markdown line per order
+        st.dataframe(
+            profile["orders"],
+            column_order=("id", "order_date", "amount", "status"),
+            hide_index=True
+        )
+
+
+def render_tickets(tickets: Dict[str, Any], limit: Optional[int] = None, key: str = "tickets"):
+    """
+    Render a customer's support tickets as one table; selecting a row shows its description.
+
+    Args:
+        tickets: Result of get_customer_support_tickets()
+        limit: Render at most this many tickets (all when None)
+        key: Widget key for the table's row selection
+    """
+    if not tickets or tickets.get("error"):
+        return
+
+    st.metric("Total Tickets", tickets.get("total_tickets", 0))
+
+    if tickets.get("total_tickets", 0) > 0:
+        shown = tickets.get("tickets", [])[:limit]
+        st.divider()
+        event = st.dataframe(
+            shown,
+            column_order=("status", "title", "priority", "category", "created_date", "resolved_date"),
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key=key
+        )
+        # Only the selected ticket's description is rendered
+        rows = event.selection.rows
+        if rows and rows[0] < len(shown):
+            ticket = shown[rows[0]]
+            st.markdown(f"**[{ticket['status'].upper()}] {ticket['title']}**")
+            st.write(ticket.get("description") or "N/A")
+        else:
+            st.caption("Select a ticket to view its description.")
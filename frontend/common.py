@@ -0,0 +1,73 @@
+"""
+Cached data helpers and widgets shared by the Streamlit pages
+"""
+
+import streamlit as st
+
+from backend.db.database import (
+    init_database,
+    is_seeded,
+    seed_sample_data,
+    get_customer_profile_by_id,
+    get_customer_support_tickets_by_id,
+    list_customers,
+)
+# RAG (ChromaDB, embedding model) is imported inside the helpers that use it,
+# so the customer pages run without loading it
+
+PICKER_LIMIT = 50
+
+
+# Initialize
+@st.cache_resource
+def init():
+    init_database()
+    if not is_seeded():
+        seed_sample_data()
+    return True
+
+@st.cache_resource
+def init_rag():
+    from backend.rag.rag_pipeline import seed_sample_documents
+    seed_sample_documents()  # Initialize RAG
+    return True
+
+# Customer list for the selectboxes, cached across reruns
+@st.cache_data(ttl=60)
+def all_customers():
+    return list_customers()
+
+# Per-customer lookups, cached so reruns don't re-query SQLite
+@st.cache_data(ttl=300, max_entries=256)
+def customer_profile(customer_id):
+    return get_customer_profile_by_id(customer_id)
+
+@st.cache_data(ttl=300, max_entries=256)
+def customer_tickets(customer_id, name):
+    return get_customer_support_tickets_by_id(customer_id, name)
+
+# Knowledge-base searches, persisted to disk so restarts keep popular queries;
+# cleared whenever documents are uploaded (Streamlit ignores ttl with persist)
+@st.cache_data(persist="disk", max_entries=2048)
+def search_documents_cached(collection, query, n):
+    from backend.rag.rag_pipeline import search_documents
+    return search_documents(collection, query, n_results=n)
+
+@st.cache_data(ttl=30)
+def collection_info(collection):
+    from backend.rag.rag_pipeline import get_collection_info
+    return get_collection_info(collection)
+
+# Selectbox label: "Name (email)"
+def customer_label(customer):
+    return f"{customer['name']} ({customer['email']})"
+
+# Type-ahead customer picker: the selectbox only ever holds the top matches
+def pick_customer(key):
+    needle = st.text_input("Filter customers:", key=f"{key}_filter").strip().lower()
+    matches = [c for c in all_customers() if needle in customer_label(c).lower()][:PICKER_LIMIT]
+    if not matches:
+        st.info("No matching customers.")
+        return None
+    # Options are the customer rows themselves, so the selection carries its id
+    return st.selectbox("Select customer:", matches, format_func=customer_label, key=key)
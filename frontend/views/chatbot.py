@@ -0,0 +1,68 @@
+"""
+AI Chatbot page
+"""
+
+import os
+
+import streamlit as st
+
+from frontend.common import init_rag
+
+# Static markdown, built once at import rather than on every rerun
+API_KEY_HELP_MD = """
+To use the AI Chatbot, you need to:
+1. Get a **FREE** API key from [Google AI Studio](https://aistudio.google.com/app/apikey)
+2. Add it to your `.env` file: `GOOGLE_API_KEY=your_key`
+3. Restart Streamlit
+
+Google's free tier includes:
+- 60 requests per minute
+- Unlimited requests per month (rate limited)
+- Perfect for development and testing!
+"""
+
+# Rerun only the question/answer block on submit, not the whole page
+@st.fragment
+def chatbot_ui():
+    with st.form("chatbot_query"):
+        user_query = st.text_input("Ask a question about our policies:")
+        asked = st.form_submit_button("Ask")
+
+    if asked and user_query:
+        try:
+            from backend.chatbot import generate_answer_stream
+            with st.spinner("🤖 Thinking..."):
+                sources, answer_stream = generate_answer_stream(user_query, n_results=5)
+
+            # Display answer as it is generated
+            st.markdown("### Answer")
+            st.write_stream(answer_stream)
+            st.success("✅ Answer Generated")
+
+            # Display sources
+            if sources:
+                st.divider()
+                st.markdown("### 📚 Sources")
+
+                for source in sources:
+                    with st.expander(f"Source {source['id']}: {source['filename']} ({source['relevance']} relevant)"):
+                        st.caption(f"Type: {source['type']}")
+
+        except Exception as e:
+            st.error(f"Error generating answer: {str(e)}")
+            st.info("Make sure your GOOGLE_API_KEY is valid and you have internet connection.")
+
+
+st.header("AI Customer Support Chatbot")
+init_rag()
+st.markdown("Ask questions about our policies and get intelligent answers powered by Google Gemini")
+
+# Check for API key
+api_key = os.getenv("GOOGLE_API_KEY")
+
+if not api_key:
+    st.warning("⚠️ **API Key Required**")
+    st.info(API_KEY_HELP_MD)
+else:
+    st.success("✅ API Key Found!")
+    chatbot_ui()
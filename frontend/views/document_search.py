@@ -0,0 +1,34 @@
+"""
+Document Search (Policies & FAQs RAG) page
+"""
+
+import streamlit as st
+
+from frontend.common import init_rag, search_documents_cached
+
+st.header("Policies & FAQs")
+init_rag()
+st.markdown("Search our knowledge base")
+
+# Search only on submit, not on every edit of the input
+with st.form("document_search"):
+    query = st.text_input("Ask a question about policies, shipping, returns, etc.")
+    submitted = st.form_submit_button("Search")
+
+if submitted and query:
+    results = search_documents_cached("policies_faqs", query, 3)
+
+    if results:
+        st.success(f"Found {len(results)} relevant answer(s)")
+
+        for i, result in enumerate(results, 1):
+            similarity = result["similarity"]
+            content = result["content"]
+            metadata = result["metadata"]
+
+            with st.expander(f"📄 Result {i} (Relevance: {similarity:.0%})", expanded=i==1):
+                st.write(content)
+                if metadata.get("type"):
+                    st.caption(f"Type: {metadata['type']} | Category: {metadata.get('category', 'N/A')}")
+    else:
+        st.info("No results found. Try rephrasing your question.")
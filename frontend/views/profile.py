@@ -0,0 +1,20 @@
+"""
+Customer Profile page
+"""
+
+import streamlit as st
+
+from frontend.common import customer_profile, pick_customer
+from frontend._render import render_profile
+
+
+# Rerun only this section when the selectbox changes
+@st.fragment
+def show_profile():
+    selected = pick_customer("profile_select")
+    if selected:
+        render_profile(customer_profile(selected["id"]))
+
+
+st.header("Customer Profile")
+show_profile()
@@ -0,0 +1,31 @@
+"""
+Support Tickets page
+"""
+
+import streamlit as st
+
+from frontend.common import customer_tickets, pick_customer
+from frontend._render import render_tickets
+
+_TICKET_PAGE_SIZE = 10
+
+
+def _show_more_tickets(limit_key):
+    st.session_state[limit_key] = st.session_state.get(limit_key, _TICKET_PAGE_SIZE) + _TICKET_PAGE_SIZE
+
+
+# Rerun only this section when the selectbox changes
+@st.fragment
+def show_tickets():
+    selected = pick_customer("ticket_select")
+    if selected:
+        tickets = customer_tickets(selected["id"], selected["name"])
+        limit_key = f"ticket_limit_{selected['id']}"
+        limit = st.session_state.get(limit_key, _TICKET_PAGE_SIZE)
+        render_tickets(tickets, limit, key=f"tickets_{selected['id']}")
+        if len(tickets.get("tickets", [])) > limit:
+            st.button("Load more", on_click=_show_more_tickets, args=(limit_key,))
+
+
+st.header("Support Tickets")
+show_tickets()
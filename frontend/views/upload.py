@@ -0,0 +1,122 @@
+"""
+Upload Documents page
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+from frontend.common import collection_info, init_rag, search_documents_cached
+
+_DECODE_BLOCK_CHARS = 64 * 1024
+_EMBED_BATCH_DOCS = 100
+
+
+# Add documents in batches, calling on_progress(fraction) after each one
+def _embed_documents(documents, on_progress):
+    from backend.rag.rag_pipeline import add_documents
+    n_chunks = 0
+    for start in range(0, len(documents), _EMBED_BATCH_DOCS):
+        n_chunks += add_documents("policies_faqs", documents[start:start + _EMBED_BATCH_DOCS])
+        on_progress(min(start + _EMBED_BATCH_DOCS, len(documents)) / len(documents))
+    return n_chunks
+
+
+# Read one uploaded file into an add_documents() dict (runs in a worker thread,
+# so it returns errors instead of calling st.*)
+def _extract_text(file):
+    if file.type == "application/pdf" or file.name.lower().endswith(".pdf"):
+        # Imported here so text-only uploads don't load the PDF parser
+        from pypdf import PdfReader
+        return "\n".join(page.extract_text() or "" for page in PdfReader(file).pages)
+    # Decode straight from the upload buffer in 64 KiB blocks instead of
+    # copying the whole file into a bytes object first
+    reader = io.TextIOWrapper(file, encoding="utf-8", errors="replace")
+    try:
+        return "".join(iter(lambda: reader.read(_DECODE_BLOCK_CHARS), ""))
+    finally:
+        reader.detach()
+
+
+def _decode_upload(file):
+    try:
+        content = _extract_text(file)
+    except Exception as e:
+        return None, f"Error reading {file.name}: {str(e)}"
+    return {
+        "id": file.name.replace(".", "_"),
+        "content": content,
+        "metadata": {
+            "filename": file.name,
+            "file_type": file.type,
+            "source": "user_upload"
+        }
+    }, None
+
+
+st.header("Upload Policy Documents")
+init_rag()
+st.markdown("Upload text or PDF files to add to the knowledge base")
+
+uploaded_files = st.file_uploader(
+    "Choose files",
+    type=["txt", "pdf", "md"],
+    accept_multiple_files=True
+)
+
+if uploaded_files:
+    st.info(f"📁 {len(uploaded_files)} file(s) ready to upload")
+
+    if st.button("Process & Upload Documents"):
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+
+        # Decode files concurrently; keep upload order for add_documents
+        decoded = [None] * len(uploaded_files)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                executor.submit(_decode_upload, file): idx
+                for idx, file in enumerate(uploaded_files)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                idx = futures[future]
+                decoded[idx] = future.result()
+                status_text.text(f"Processed {uploaded_files[idx].name}")
+                progress_bar.progress(done / len(uploaded_files))
+
+        documents = []
+        for doc, error in decoded:
+            if error:
+                st.error(error)
+            else:
+                documents.append(doc)
+
+        if documents:
+            try:
+                from backend.chatbot import invalidate_response_cache
+
+                def show_progress(fraction):
+                    status_text.text(f"Embedded {fraction:.0%} of documents")
+                    progress_bar.progress(fraction)
+
+                progress_bar.progress(0.0)
+                n_chunks = _embed_documents(documents, show_progress)
+                invalidate_response_cache()
+                search_documents_cached.clear()
+                collection_info.clear()
+
+                st.success(f"✅ Successfully uploaded {len(documents)} document(s) ({n_chunks} chunks)")
+                st.balloons()
+            except Exception as e:
+                st.error(f"Error uploading documents: {str(e)}")
+
+st.divider()
+st.subheader("📊 Knowledge Base Status")
+
+info = collection_info("policies_faqs")
+col1, col2 = st.columns(2)
+with col1:
+    st.metric("Documents in KB", info.get("count", 0))
+with col2:
+    st.metric("Status", "Ready" if info.get("count", 0) > 0 else "Empty")
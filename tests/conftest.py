@@ -0,0 +1,24 @@
+"""
+Shared pytest setup: make the repository root importable as in the app entry
+points, and give every test its own seeded copy of the customer database
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.db import database  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def customer_db(tmp_path, monkeypatch):
+    """Point backend.db.database at a freshly seeded database under tmp_path."""
+    database.close()
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "customers.db")
+    database.init_database()
+    database.seed_sample_data()
+    yield tmp_path / "customers.db"
+    database.close()
@@ -0,0 +1,54 @@
+"""
+Tests for customer-name extraction and query routing in backend.agents
+"""
+
+import pytest
+
+from backend.agents import agents
+from backend.agents.agents import CustomerAgent, MultiAgentOrchestrator, PolicyAgent
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("Show the profile for Ema Johnson", "Ema Johnson"),
+    ("profile for ema johnson", "ema"),
+    ("tickets for customer Ema", "Ema"),
+    ("What about Ema's orders?", "Ema"),
+    ('Show tickets of "ema johnson"', "ema johnson"),
+    ("show Ema Johnson's tickets", "Ema Johnson"),
+    ("show tickets of Ema", "Ema"),
+    ("show me all tickets", None),
+    ("Lisa's account", "Lisa"),
+    ("Show profile john", "john"),
+    ("Ema Johnson's profile details", "Ema Johnson"),
+])
+def test_extract_customer_name(question, expected):
+    assert CustomerAgent()._extract_customer_name(question) == expected
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    """Record the policy names PolicyAgent asks for instead of reading documents."""
+    requested = []
+    monkeypatch.setattr(agents, "get_policy_summary", lambda name: requested.append(name) or "")
+    return requested
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("what are the shipping and refund terms", "refund_policy"),
+    ("privacy or warranty?", "warranty_policy"),
+    ("terms of shipping", "shipping_policy"),
+])
+def test_policy_summary_priority(summaries, question, expected):
+    PolicyAgent().process_query(question)
+    assert summaries == [expected]
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("what are the shipping and refund terms", "refund_policy"),
+    ("is there a guarantee on shipping or warranty", "warranty_policy"),
+    ("explain the privacy policy and terms", "privacy_policy"),
+    ("is this item nonrefundable", "refund_policy"),
+])
+def test_route_query_policy_priority(summaries, question, expected):
+    MultiAgentOrchestrator().route_query(question)
+    assert summaries == [expected]
@@ -0,0 +1,133 @@
+"""
+Tests for the chatbot's response cache and streamed citation stripping
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from backend import chatbot
+
+
+class FakeLLM:
+    """Stands in for ChatGoogleGenerativeAI: answers with its model name and counts calls."""
+
+    def __init__(self, model):
+        self.model = model
+        self.temperature = 0.7
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=f"answer from {self.model}")
+
+
+@pytest.fixture
+def documents(monkeypatch):
+    """Policy search results served to the chatbot (mutate the list to change them)."""
+    hits = []
+    chatbot.invalidate_response_cache()
+    monkeypatch.setattr(chatbot, "_get_customer_names", lambda: None)
+    monkeypatch.setattr(chatbot, "search_documents", lambda *args, **kwargs: list(hits))
+    yield hits
+    chatbot.invalidate_response_cache()
+
+
+HIT = {"content": "Refunds within 30 days.", "similarity": 0.9, "metadata": {"filename": "refund.txt"}}
+
+
+def test_response_cache_is_per_model(documents):
+    documents.append(HIT)
+    flash, pro = FakeLLM("flash"), FakeLLM("pro")
+
+    assert chatbot.generate_answer("What is the refund policy?", llm=flash)["answer"] == "answer from flash"
+    assert chatbot.generate_answer("What is the refund policy?", llm=pro)["answer"] == "answer from pro"
+    assert chatbot.generate_answer("what is the refund policy? ", llm=flash)["answer"] == "answer from flash"
+    assert (flash.calls, pro.calls) == (1, 1)
+
+
+def test_no_context_answer_is_not_cached(documents):
+    llm = FakeLLM("flash")
+
+    first = chatbot.generate_answer("What is the refund policy?", llm=llm)
+    assert first["has_context"] is False
+
+    documents.append(HIT)
+    second = chatbot.generate_answer("What is the refund policy?", llm=llm)
+    assert second["has_context"] is True
+    assert llm.calls == 1
+
+
+ANSWER = "Refunds take 5 days [Source 2]. Returns are free (Source 1) within 30 days [Source 3]."
+
+
+def _strip_whole(text):
+    return chatbot._SOURCE_CITE_RE.sub("", text).strip()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16])
+def test_strip_citations_stream_matches_whole_answer(size):
+    chunks = [ANSWER[i:i + size] for i in range(0, len(ANSWER), size)]
+    assert "".join(chatbot._strip_citations_stream(chunks)) == _strip_whole(ANSWER)
+
+
+def test_strip_citations_stream_citation_split_at_every_point():
+    text = "  Covered [Source 12] for a year (Source 4)  "
+    for cut in range(len(text) + 1):
+        streamed = "".join(chatbot._strip_citations_stream([text[:cut], text[cut:]]))
+        assert streamed == _strip_whole(text)
+
+
+@pytest.mark.parametrize("text", [
+    "A [Source 1 (see x] B",
+    "A (Source 2 [note) B",
+    "A [Source 1 (Source 2) x] B",
+])
+def test_strip_citations_stream_nested_opener(text):
+    for size in (1, 2, 5):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert "".join(chatbot._strip_citations_stream(chunks)) == _strip_whole(text)
+
+
+def test_strip_citations_stream_keeps_unclosed_brackets():
+    text = "Use code [SAVE10 at checkout (see FAQ"
+    assert "".join(chatbot._strip_citations_stream(list(text))) == text
+
+
+def test_customer_and_policy_retrieval_overlap(documents, monkeypatch):
+    searching = threading.Event()
+
+    def search(*args, **kwargs):
+        searching.set()
+        return [HIT]
+
+    def customer_context(query, mentioned):
+        # Only finds the search running if the two retrievals are concurrent
+        return "=== CUSTOMER ===" if searching.wait(timeout=2) else ""
+
+    monkeypatch.setattr(chatbot, "search_documents", search)
+    monkeypatch.setattr(chatbot, "_customer_context", customer_context)
+
+    sources, _ = chatbot.generate_answer_stream("refund policy for my account", llm=FakeLLM("flash"))
+    assert [source["type"] for source in sources] == ["customer_data", "document"]
+
+
+def test_customers_sharing_a_name_are_all_mentioned(monkeypatch):
+    automaton = chatbot._build_name_automaton([
+        {"id": 1, "name": "Ema Johnson"},
+        {"id": 6, "name": "Ema Johnson"},
+        {"id": 2, "name": "John Smith"},
+    ])
+    monkeypatch.setattr(chatbot, "_get_customer_names", lambda: automaton)
+
+    plan = chatbot._plan_query("tickets for ema johnson", 5, "policies_faqs")
+    assert plan["mentioned"] == [(1, "Ema Johnson"), (6, "Ema Johnson")]
+
+
+def test_customer_context_lists_ticket_titles():
+    context = chatbot._customer_context("tickets for ema", [(1, "Ema Johnson")])
+    assert "Customer: Ema Johnson" in context
+    assert "Support Tickets (4):" in context
+    assert "  - Subscription upgrade: open" in context
+    assert "N/A: " not in context
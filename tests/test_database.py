@@ -0,0 +1,67 @@
+"""
+Tests for the read-only ad-hoc query connection in backend.db.database
+"""
+
+import threading
+import time
+
+import pytest
+
+from backend.db import database
+from backend.db.database import query_database, search_customers
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT COUNT(*) FROM customers",
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3) SELECT i FROM n",
+])
+def test_query_database_allows_reads(sql):
+    assert isinstance(query_database(sql), list)
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO customers (id, name) VALUES (999999, 'x')",
+    "UPDATE customers SET name = 'x'",
+    "DELETE FROM customers",
+    "DROP TABLE customers",
+    "CREATE TABLE scratch (id INTEGER)",
+    "WITH c AS (SELECT 1) DELETE FROM customers",
+    "PRAGMA query_only = OFF",
+    "PRAGMA table_info(customers)",
+    "ATTACH DATABASE ':memory:' AS scratch",
+])
+def test_query_database_rejects_everything_else(sql):
+    assert "error" in query_database(sql)
+
+
+RUNAWAY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n"
+
+
+def test_runaway_query_times_out_without_blocking_reads():
+    outcome = {}
+    worker = threading.Thread(
+        target=lambda: outcome.update(result=query_database(RUNAWAY, timeout=1.0))
+    )
+    started = time.monotonic()
+    worker.start()
+
+    # Other lookups are not held up while the ad-hoc query runs
+    time.sleep(0.1)
+    assert search_customers("Ema")
+    assert time.monotonic() - started < 0.9
+
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert "time limit" in outcome["result"]["error"]
+
+
+def test_close_interrupts_a_running_query():
+    worker = threading.Thread(target=query_database, args=(RUNAWAY, 60))
+    worker.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    database.close()
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert time.monotonic() - started < 5
@@ -0,0 +1,27 @@
+"""
+Tests for backend.keywords: compiled patterns match like substring checks
+"""
+
+import pytest
+
+from backend.keywords import compile_keywords
+
+KEYWORDS = ["refund", "order", "how", "what is", "support ticket", "support"]
+
+
+@pytest.mark.parametrize("text", [
+    "Is this nonrefundable?",
+    "Please reorder my items",
+    "show me the terms",
+    "WHAT IS the policy",
+    "open a Support Ticket",
+    "no keywords here",
+    "",
+])
+def test_matches_like_substring_checks(text):
+    found = compile_keywords(KEYWORDS).search(text) is not None
+    assert found == any(keyword in text.lower() for keyword in KEYWORDS)
+
+
+def test_match_is_longest_keyword_at_position():
+    assert compile_keywords(KEYWORDS).search("my support ticket").group(0) == "support ticket"